@@ -0,0 +1,66 @@
+"""
+Compare the JSON decoding paths of DucoDevice.fetch_json on /info/nodes sized payloads.
+
+Run with: python -m benchmarks.bench_json_decode
+"""
+import json
+import timeit
+
+from duco import _json
+
+
+def make_info_nodes_payload(node_count):
+    nodes = []
+    for node in range(1, node_count + 1):
+        nodes.append({
+            "Node": node,
+            "General": {
+                "Type": {"Val": "UCCO2"},
+                "SubType": {"Val": 0},
+                "NetworkType": {"Val": "RF"},
+                "Parent": {"Val": 1},
+                "Asso": {"Val": 1},
+                "Name": {"Val": f"Room {node}"},
+                "Identify": {"Val": 0},
+            },
+            "Ventilation": {
+                "State": {"Val": "AUTO"},
+                "TimeStateRemain": {"Val": 0},
+                "TimeStateEnd": {"Val": 0},
+                "Mode": {"Val": "-"},
+                "FlowLvlTgt": {"Val": 35},
+            },
+            "Sensor": {"Co2": {"Val": 600 + node}, "IaqCo2": {"Val": 80}, "Rh": {"Val": 45}, "Temp": {"Val": 21.5}},
+        })
+    return json.dumps({"Nodes": nodes}).encode("utf-8")
+
+
+def text_then_json(body):
+    # The previous fetch_json path: decode to text, scan it, then parse the body again
+    text = body.decode("utf-8")
+    if "SUCCESS" in text or "FAILED" in text:
+        return {"action_state": text.strip()}
+    return json.loads(body.decode("utf-8"))
+
+
+def main():
+    print(f"Installed JSON backend: {_json.JSON_BACKEND}")
+    candidates = [
+        ("text + json (previous)", text_then_json),
+        ("bytes + json", lambda body: json.loads(body)),
+    ]
+    if _json.orjson is not None:
+        candidates.append(("bytes + orjson", _json.orjson.loads))
+    candidates.append(("decode_body", _json.decode_body))
+
+    for node_count in (1, 10, 30, 100):
+        body = make_info_nodes_payload(node_count)
+        print(f"\n{node_count} nodes, {len(body)} bytes")
+        for name, decode in candidates:
+            number = max(10, 20000 // node_count)
+            seconds = min(timeit.repeat(lambda: decode(body), number=number, repeat=5)) / number
+            print(f"  {name:<24} {seconds * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
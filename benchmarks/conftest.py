@@ -0,0 +1,21 @@
+import asyncio
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.fixture
+def bench_loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def run(bench_loop):
+    """
+    Run a coroutine function to completion on the benchmark event loop.
+    """
+    def run(coroutine_function, *args, **kwargs):
+        return bench_loop.run_until_complete(coroutine_function(*args, **kwargs))
+    return run
@@ -0,0 +1,54 @@
+"""
+I/O path benchmarks against a local FakeDucoServer.
+
+Run with: python -m pytest benchmarks --benchmark-only
+"""
+import pytest
+from duco import DucoDevice
+from duco.simulator import FakeDucoServer
+
+NODE_COUNT = 30
+LATENCY = 0.005
+ROUNDS = 5
+NO_CACHE = {"board_info": 0, "node_list": 0, "node_info": 0, "node_index": 0}
+
+
+@pytest.fixture(params=[1.0, 2.2], ids=["api1.0", "api2.2"])
+def device(request, run):
+    server = FakeDucoServer(api_version=request.param, node_count=NODE_COUNT, latency=LATENCY)
+    run(server.start)
+    device = DucoDevice(server.address, port=server.port, api_version=request.param, cache_ttl=NO_CACHE)
+    yield device
+    run(device.close)
+    run(server.close)
+
+
+def bench(benchmark, run, coroutine_function, *args, **kwargs):
+    return benchmark.pedantic(lambda: run(coroutine_function, *args, **kwargs), rounds=ROUNDS, iterations=1,
+                              warmup_rounds=1)
+
+
+def test_sweep_serial_baseline(benchmark, run, device):
+    async def sweep():
+        nodes = {}
+        for node in await device.get_node_list():
+            nodes[node] = await device.get_node_info(node)
+        return nodes
+
+    assert len(bench(benchmark, run, sweep)) == NODE_COUNT
+
+
+def test_sweep_concurrent(benchmark, run, device):
+    nodes, errors = bench(benchmark, run, device.get_all_node_info)
+    assert len(nodes) == NODE_COUNT and not errors
+
+
+def test_node_classification(benchmark, run, device):
+    node_index = bench(benchmark, run, device.get_node_index)
+    assert sum(len(nodes) for nodes in node_index["netw"].values()) == NODE_COUNT
+
+
+def test_write_batch(benchmark, run, device):
+    operations = [(node, "MAN2") for node in range(2, NODE_COUNT + 1)]
+    results = bench(benchmark, run, device.set_nodes_batch, operations, max_concurrency=4)
+    assert all(result.success for result in results)
@@ -0,0 +1,29 @@
+"""
+Columnar export benchmarks over a synthetic fleet snapshot.
+
+Run with: python -m pytest benchmarks --benchmark-only
+"""
+import pytest
+from duco.export import numpy, snapshot_to_columns
+
+BOXES = 300
+NODES_PER_BOX = 30
+BACKENDS = ["list"] + (["numpy"] if numpy is not None else [])
+
+
+@pytest.fixture(scope="module")
+def snapshots():
+    return {
+        f"10.0.{box // 256}.{box % 256}:80": {
+            node: {"node": node, "devtype": "UCCO2", "state": "AUTO", "co2": 400 + node, "temp": 21.0,
+                   **({"rh": 40 + node} if node % 2 else {})}
+            for node in range(1, NODES_PER_BOX + 1)
+        }
+        for box in range(BOXES)
+    }
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_snapshot_to_columns(benchmark, snapshots, backend):
+    columns = benchmark(snapshot_to_columns, snapshots, backend=backend)
+    assert len(columns["node"]) == BOXES * NODES_PER_BOX
@@ -0,0 +1,23 @@
+"""
+Package import time benchmarks. Each round starts a fresh interpreter, so the numbers include interpreter
+startup; compare them against the "python" baseline.
+
+Run with: python -m pytest benchmarks --benchmark-only
+"""
+import subprocess
+import sys
+import pytest
+
+ROUNDS = 5
+STATEMENTS = {
+    "python": "pass",
+    "duco": "import duco",
+    "device": "import duco; duco.DucoDevice",
+    "discovery": "import duco; duco.discover_duco_devices",
+}
+
+
+@pytest.mark.parametrize("statement", list(STATEMENTS.values()), ids=list(STATEMENTS))
+def test_import(benchmark, statement):
+    benchmark.pedantic(subprocess.check_call, args=([sys.executable, "-c", statement],), rounds=ROUNDS,
+                       iterations=1, warmup_rounds=1)
@@ -1,5 +1,52 @@
-from .discovery import discover_duco_devices, get_api_version
-from .device import DucoDevice
+import importlib
 
+# Public name -> submodule that defines it. Submodules are imported on first attribute access (PEP 562), so
+# a script that only talks to a device never imports zeroconf or requests.
+_LAZY_ATTRIBUTES = {
+    'ApiAdapter': 'adapters',
+    'async_discover_duco_devices': 'discovery',
+    'async_fleet_columns': 'export',
+    'async_get_api_version': 'probe',
+    'async_load_duco_devices': 'discovery_cache',
+    'async_stream_duco_devices': 'discovery',
+    'DeltaTracker': 'deltas',
+    'DEVICE_ADDED': 'discovery',
+    'DEVICE_REMOVED': 'discovery',
+    'DEVICE_UPDATED': 'discovery',
+    'discover_duco_devices': 'discovery',
+    'DiscoveryCache': 'discovery_cache',
+    'DiscoveryEvent': 'discovery',
+    'DucoCoordinator': 'coordinator',
+    'DucoDevice': 'device',
+    'DucoDeviceSync': 'sync',
+    'DucoFleet': 'fleet',
+    'DucoProxy': 'proxy',
+    'export_prometheus': 'metrics',
+    'FleetResult': 'fleet',
+    'get_api_version': 'discovery',
+    'HistoryStore': 'history',
+    'Instrumentation': 'metrics',
+    'MetricsCollector': 'metrics',
+    'NodeDelta': 'deltas',
+    'NodeInfo': 'models',
+    'NodeUpdate': 'coordinator',
+    'register_adapter': 'adapters',
+    'snapshot_to_columns': 'export',
+    'Subscription': 'coordinator',
+    'WriteResult': 'device',
+}
 
-__all__ = ['discover_duco_devices', 'DucoDevice', 'get_api_version']
\ No newline at end of file
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,36 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ACTION_STATES = (b"SUCCESS", b"FAILED")
+# Action replies are a single word; anything longer is a JSON document
+ACTION_STATE_MAX_LENGTH = 64
+
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+    loads = orjson.loads
+else:
+    JSON_BACKEND = "json"
+    loads = json.loads
+
+
+def decode_body(body, content_type=None):
+    """
+    Decode a raw response body from a Duco device in a single pass.
+
+    :param body: The response body as bytes.
+    :param content_type: Optional response content type, used when the body does not look like JSON.
+    :return: {"action_state": ...} for action replies, the decoded JSON document otherwise.
+    :raises ValueError: If the body is neither an action reply nor valid JSON.
+    """
+    body = body.strip()
+    if body[:1] in (b"{", b"["):
+        return loads(body)
+    if len(body) <= ACTION_STATE_MAX_LENGTH and any(state in body for state in ACTION_STATES):
+        return {"action_state": body.decode("utf-8", "replace")}
+    if content_type == "application/json":
+        return loads(body)
+    raise ValueError(f"Unexpected content type: {content_type}")
@@ -0,0 +1,227 @@
+import logging
+from .models import FIELD_PATHS, NodeInfo, parse_node_info_v2
+
+_LOGGER = logging.getLogger(__name__)
+
+# Major firmware API version -> API version whose endpoints it serves. Filled in by register_adapter.
+API_VERSION_MAPPING = {}
+
+_ADAPTERS = {}
+
+
+class ApiAdapter:
+    """
+    Endpoints and response normalizers of one Duco firmware API version.
+
+    A DucoDevice picks its adapter once, when its API version is set, so requests never branch on the version.
+    Support for new firmware is added by subclassing and passing an instance to register_adapter().
+    """
+
+    version = None
+    board_info_path = None
+    node_list_path = None
+    node_info_template = None
+    bulk_node_info_path = None
+    # (method, route) pairs of the write endpoints, in aiohttp route syntax
+    write_routes = ()
+
+    def __init__(self):
+        self._node_info_paths = {}
+
+    def __repr__(self):
+        return f"{type(self).__name__}(version={self.version!r})"
+
+    def node_info_path(self, node):
+        """
+        :return: The query string of a single node info request, built once per node.
+        """
+        path = self._node_info_paths.get(node)
+        if path is None:
+            path = self._node_info_paths[node] = self.node_info_template.format(node=node)
+        return path
+
+    def parse_node_list(self, data):
+        """
+        :return: A list of node IDs.
+        """
+        raise NotImplementedError
+
+    def parse_node_info(self, data):
+        """
+        :return: A flat node info dictionary, or None if the payload is not usable.
+        """
+        raise NotImplementedError
+
+    def node_record(self, node_info):
+        """
+        :return: A NodeInfo built from a flat node info dictionary returned by parse_node_info.
+        """
+        return NodeInfo.from_dict(node_info)
+
+    def parse_bulk_node_info(self, data):
+        """
+        :return: A list of (node, node_info) tuples, or None if the bulk payload is not usable.
+        """
+        return None
+
+    def parse_board_serial(self, data):
+        """
+        :return: The communication board serial from a board info payload, or None.
+        """
+        raise NotImplementedError
+
+    def operational_state_request(self, node, state):
+        """
+        :return: A (method, query_string, body) tuple that sets the operational state of a node.
+        """
+        raise NotImplementedError
+
+    def parameter_request(self, node, key, value):
+        """
+        :return: A (method, query_string, body) tuple that sets a parameter of a node.
+        """
+        raise NotImplementedError
+
+    def parse_write_response(self, data):
+        """
+        :return: The write response as {"action_state": ...}, or None if the request failed.
+        """
+        return data
+
+    def node_list_payload(self, nodes):
+        """
+        :return: The node list response body for the given node IDs, as the device would send it.
+        """
+        raise NotImplementedError
+
+
+class V1Adapter(ApiAdapter):
+    """
+    API 1.0, served by the communication and print board.
+    """
+
+    version = 1.0
+    board_info_path = "board_info"
+    node_list_path = "nodelist"
+    node_info_template = "nodeinfoget?node={node}"
+    write_routes = (("GET", "/nodeinfoset"), ("GET", "/nodesetoperstate"))
+    # Flat node info field -> parameter name of nodeinfoset
+    config_keys = {field: v1_key for field, v1_key, _ in FIELD_PATHS if field != v1_key}
+
+    def parse_node_list(self, data):
+        if isinstance(data, dict):
+            return data.get("nodelist", [])
+        if isinstance(data, list):
+            return data
+        return []
+
+    def parse_node_info(self, data):
+        return data if isinstance(data, dict) else None
+
+    def node_record(self, node_info):
+        return NodeInfo.from_v1(node_info)
+
+    def parse_board_serial(self, data):
+        return data.get("serial") if isinstance(data, dict) else None
+
+    def operational_state_request(self, node, state):
+        return "GET", f"nodesetoperstate?node={node}&value={state}", None
+
+    def parameter_request(self, node, key, value):
+        return "GET", f"nodeinfoset?node={node}&para={self.config_keys.get(key, key)}&value={value}", None
+
+    def node_list_payload(self, nodes):
+        return {"nodelist": list(nodes)}
+
+
+class V22Adapter(ApiAdapter):
+    """
+    API 2.2, served by the connectivity board. Node payloads are flattened onto the same fields as API 1.0.
+    """
+
+    version = 2.2
+    board_info_path = "info"
+    node_list_path = "nodes"
+    node_info_template = "info/nodes/{node}"
+    bulk_node_info_path = "info/nodes"
+    write_routes = (("POST", "/action/nodes/{node}"), ("PATCH", "/config/nodes/{node}"))
+    # Flat node info field -> key of the node configuration
+    config_keys = {"location": "Name"}
+
+    def parse_node_list(self, data):
+        if isinstance(data, list):
+            return [item["Node"] if isinstance(item, dict) and "Node" in item else item for item in data]
+        if isinstance(data, dict):
+            return data.get("nodelist", [])
+        return []
+
+    def parse_node_info(self, data):
+        return parse_node_info_v2(data) if isinstance(data, dict) else None
+
+    def parse_bulk_node_info(self, data):
+        if not isinstance(data, dict) or not isinstance(data.get("Nodes"), list):
+            return None
+        return [(item["Node"], parse_node_info_v2(item)) for item in data["Nodes"]
+                if isinstance(item, dict) and "Node" in item]
+
+    def parse_board_serial(self, data):
+        if not isinstance(data, dict):
+            return None
+        return ((data.get("General") or {}).get("Board") or {}).get("SerialBoardComm", {}).get("Val")
+
+    def operational_state_request(self, node, state):
+        return "POST", f"action/nodes/{node}", {"Action": "SetVentilationState", "Val": state}
+
+    def parameter_request(self, node, key, value):
+        return "PATCH", f"config/nodes/{node}", {self.config_keys.get(key, key): {"Val": value}}
+
+    def parse_write_response(self, data):
+        if data is None or "action_state" in data:
+            return data
+        # Writes are answered with {"Result": "SUCCESS"} or {"Result": "FAILED"}. Without a Result, only a failed
+        # HTTP status would have reported an error.
+        return {"action_state": data.get("Result", "SUCCESS") if isinstance(data, dict) else "SUCCESS"}
+
+    def node_list_payload(self, nodes):
+        return [{"Node": node} for node in nodes]
+
+
+def register_adapter(adapter):
+    """
+    Make an adapter available to DucoDevice. It replaces any adapter registered for the same version, and
+    serves devices that report another minor version of the same major version unless a higher one does.
+    """
+    _ADAPTERS[adapter.version] = adapter
+    major = int(adapter.version)
+    if API_VERSION_MAPPING.get(major, adapter.version) <= adapter.version:
+        API_VERSION_MAPPING[major] = adapter.version
+
+
+def normalize_api_version(version):
+    """
+    Map a version reported by a device, such as "2.2" or 1.0, to the API version whose endpoints it serves.
+
+    :return: The version of a registered adapter, such as 1.0 or 2.2, or None if the version is unknown.
+    """
+    try:
+        version = float(version)
+    except (TypeError, ValueError):
+        return None
+    if version in _ADAPTERS:
+        return version
+    return API_VERSION_MAPPING.get(int(version))
+
+
+def get_adapter(api_version):
+    """
+    :return: The adapter serving the given API version.
+    :raises NotImplementedError: If no adapter serves the version.
+    """
+    adapter = _ADAPTERS.get(normalize_api_version(api_version))
+    if adapter is None:
+        raise NotImplementedError(f"Unsupported API version: {api_version!r}")
+    return adapter
+
+
+register_adapter(V1Adapter())
+register_adapter(V22Adapter())
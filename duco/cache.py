@@ -0,0 +1,59 @@
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    A small size-bounded cache where every entry expires after its own time-to-live.
+
+    The least recently used entry is evicted once the cache holds more than maxsize entries.
+    """
+
+    def __init__(self, maxsize=256, clock=time.monotonic):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for key, or default if it is missing or expired.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires, value = entry
+        if expires <= self._clock():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl):
+        """
+        Store value under key for ttl seconds. A ttl of 0 or less does not store anything.
+        """
+        if ttl is None or ttl <= 0:
+            return
+        self._data[key] = (self._clock() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, predicate=None):
+        """
+        Drop entries from the cache.
+
+        :param predicate: Optional callable taking a key. Only keys for which it returns True are dropped.
+            Without a predicate the whole cache is cleared.
+        """
+        if predicate is None:
+            self._data.clear()
+            return
+        for key in [key for key in self._data if predicate(key)]:
+            del self._data[key]
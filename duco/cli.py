@@ -0,0 +1,229 @@
+"""
+The pyduco command line tool.
+
+Every command writes newline-delimited JSON to stdout, one object per line, as soon as each result is known.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from .device import DucoDevice
+from .fleet import DucoFleet
+
+
+def parse_target(value, default_port=80):
+    """
+    Split "host" or "host:port" into a (host, port) tuple.
+    """
+    if value.count(":") > 1 and not value.startswith("["):
+        return value, default_port
+    host, separator, port = value.rpartition(":")
+    if not separator or not port.isdigit():
+        return value.strip("[]"), default_port
+    return host.strip("[]"), int(port)
+
+
+def read_targets(hosts, files, default_port=80):
+    """
+    Collect the targets given on the command line and in address files, without duplicates.
+
+    :param hosts: List of "host" or "host:port" strings.
+    :param files: List of paths of files with one target per line, or "-" for stdin. Blank lines and lines
+        starting with # are ignored.
+    :return: List of (host, port) tuples in the order given.
+    """
+    values = list(hosts)
+    for path in files:
+        if path == "-":
+            values.extend(sys.stdin.read().splitlines())
+            continue
+        with open(path) as address_file:
+            values.extend(address_file.read().splitlines())
+    targets = []
+    for value in values:
+        value = value.split("#", 1)[0].strip()
+        if not value:
+            continue
+        target = parse_target(value, default_port)
+        if target not in targets:
+            targets.append(target)
+    return targets
+
+
+def parse_operation(value):
+    """
+    Parse a write given as NODE:STATE or NODE:KEY=VALUE into a set_nodes_batch operation.
+    """
+    node, separator, action = value.partition(":")
+    if not separator or not node.isdigit() or not action:
+        raise argparse.ArgumentTypeError(f"expected NODE:STATE or NODE:KEY=VALUE, got {value!r}")
+    key, separator, parameter = action.partition("=")
+    if separator:
+        return int(node), key, parameter
+    return int(node), action
+
+
+class NdjsonWriter:
+    """
+    Writes one JSON object per line and flushes it straight away.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.errors = 0
+
+    def write(self, record):
+        if "error" in record:
+            self.errors += 1
+        self.stream.write(json.dumps(record, default=str) + "\n")
+        self.stream.flush()
+
+
+def _host_label(device):
+    return f"{device.address}:{device.port}"
+
+
+def _error(error):
+    return str(error) or type(error).__name__
+
+
+async def _open_device(fleet, host, port, args):
+    if args.api_version is not None:
+        return fleet.add_device(host, port=port, api_version=args.api_version)
+    device = await DucoDevice.connect(host, port=port, probe_timeout=args.probe_timeout, connector=fleet.connector)
+    fleet.devices.append(device)
+    return device
+
+
+async def _run_targets(targets, args, writer, work):
+    """
+    Open every target and run work(device, writer) on all of them concurrently, bounded by the fleet limits.
+    Targets that cannot be reached or fail get an error line of their own.
+    """
+    timeout = getattr(args, "timeout", None) or None
+    fleet = DucoFleet(limit=args.concurrency, limit_per_host=args.per_host)
+
+    async def run(host, port):
+        try:
+            device = await _open_device(fleet, host, port, args)
+            await asyncio.wait_for(work(device, writer), timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            writer.write({"host": f"{host}:{port}", "error": _error(e)})
+
+    async with fleet:
+        await asyncio.gather(*(run(host, port) for host, port in targets))
+
+
+async def _discover(args, writer):
+    from .discovery import async_stream_duco_devices
+
+    async for event in async_stream_duco_devices(timeout=args.timeout or None):
+        writer.write(dict(event.device, event=event.event))
+
+
+async def _snapshot(args, writer):
+    async def snapshot(device, writer):
+        host = _host_label(device)
+        async for node, node_info, error in device.iter_all_node_info(max_concurrency=args.max_concurrency):
+            if error is None:
+                writer.write({"host": host, "node": node, "time": time.time(), "info": node_info})
+            else:
+                writer.write({"host": host, "node": node, "error": _error(error)})
+
+    await _run_targets(args.targets, args, writer, snapshot)
+
+
+async def _watch(args, writer):
+    async def watch(device, writer):
+        host = _host_label(device)
+        async for delta in device.watch_deltas(interval=args.interval, max_concurrency=args.max_concurrency):
+            writer.write(dict(delta._asdict(), host=host))
+
+    await _run_targets(args.targets, args, writer, watch)
+
+
+async def _set(args, writer):
+    async def write(device, writer):
+        host = _host_label(device)
+        results = await device.set_nodes_batch(args.operations, retries=args.retries, verify=args.verify)
+        for result in results:
+            record = {"host": host, "node": result.operation[0], "operation": result.operation,
+                      "success": result.success, "attempts": result.attempts, "response": result.response}
+            if args.verify:
+                record["verified"] = result.verified
+            writer.write(record)
+
+    await _run_targets(args.targets, args, writer, write)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="pyduco", description="Query and control Duco devices.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log debug messages to stderr")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+
+    discover = commands.add_parser("discover", help="find devices on the local network")
+    discover.add_argument("--timeout", type=float, default=5, help="seconds to browse, 0 to run until stopped")
+    discover.set_defaults(handler=_discover)
+
+    targets = argparse.ArgumentParser(add_help=False)
+    targets.add_argument("hosts", nargs="*", metavar="HOST[:PORT]", help="devices to contact")
+    targets.add_argument("-f", "--file", dest="files", action="append", default=[],
+                         help="file with one HOST[:PORT] per line, - for stdin; may be repeated")
+    targets.add_argument("--port", type=int, default=80, help="port for targets without one (default: 80)")
+    targets.add_argument("--api-version", type=float, choices=(1.0, 2.2),
+                         help="skip version detection and use this API version for every device")
+    targets.add_argument("--probe-timeout", type=float, default=2, help="seconds to wait for version detection")
+    targets.add_argument("--concurrency", type=int, default=64, help="maximum requests in flight overall")
+    targets.add_argument("--per-host", type=int, default=2, help="maximum requests in flight per device")
+    targets.add_argument("--max-concurrency", type=int, default=4, help="maximum node requests per device")
+
+    snapshot = commands.add_parser("snapshot", parents=[targets], help="print every node of every device once")
+    snapshot.add_argument("--timeout", type=float, default=30, help="seconds a single device may take")
+    snapshot.set_defaults(handler=_snapshot)
+
+    watch = commands.add_parser("watch", parents=[targets], help="print node fields as they change")
+    watch.add_argument("--interval", type=float, default=5, help="seconds between polls (default: 5)")
+    watch.set_defaults(handler=_watch)
+
+    write = commands.add_parser("set", parents=[targets], help="write node states or parameters")
+    write.add_argument("-o", "--op", dest="operations", action="append", type=parse_operation, required=True,
+                       metavar="NODE:STATE|NODE:KEY=VALUE", help="write to apply to every device; may be repeated")
+    write.add_argument("--retries", type=int, default=2, help="retries for a write that got no response")
+    write.add_argument("--verify", action="store_true", help="read the nodes back and check the written values")
+    write.add_argument("--timeout", type=float, default=30, help="seconds a single device may take")
+    write.set_defaults(handler=_set)
+    return parser
+
+
+def main(argv=None):
+    """
+    Run the pyduco command line tool.
+
+    :return: Exit status: 0 on success, 1 if any line reported an error, 2 on bad usage.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, stream=sys.stderr)
+    if args.command != "discover":
+        try:
+            args.targets = read_targets(args.hosts, args.files, args.port)
+        except OSError as e:
+            parser.error(str(e))
+        if not args.targets:
+            parser.error("no targets given")
+
+    writer = NdjsonWriter()
+    try:
+        asyncio.run(args.handler(args, writer))
+    except KeyboardInterrupt:
+        return 130
+    return 1 if writer.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
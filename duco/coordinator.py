@@ -0,0 +1,182 @@
+import asyncio
+import inspect
+import logging
+import random
+import time
+from collections import namedtuple
+
+_LOGGER = logging.getLogger(__name__)
+
+NodeUpdate = namedtuple('NodeUpdate', ['node', 'attribute', 'value', 'timestamp'])
+
+
+class Subscription:
+    """
+    A request to receive one node attribute at a fixed interval.
+    """
+
+    def __init__(self, node, attribute, interval, callback=None):
+        self.node = node
+        self.attribute = attribute
+        self.interval = interval
+        self.callback = callback
+        self.next_due = 0.0
+
+    def __repr__(self):
+        return f"Subscription(node={self.node!r}, attribute={self.attribute!r}, interval={self.interval!r})"
+
+
+class DucoCoordinator:
+    """
+    Poll node attributes of a DucoDevice on behalf of many subscribers.
+
+    Subscriptions on the same node that are due at about the same time share one get_node_info call. Nodes are
+    spread out with random jitter, and a node that stops answering is polled with exponential backoff. Every
+    node is polled in a task of its own, so a slow node never holds up the others.
+    Updates go to the subscription callback, or to the coordinator queue when no callback is given. A callback
+    that raises is logged and does not stop the coordinator.
+    """
+
+    def __init__(self, device, jitter=0.1, coalesce_window=0.5, max_backoff=60, queue=None):
+        """
+        :param device: The DucoDevice to poll.
+        :param jitter: Fraction of the interval added as random delay to each schedule.
+        :param coalesce_window: Fraction of its interval by which a subscription may be served early so it can
+            share a fetch with another subscription on the same node.
+        :param max_backoff: Maximum delay in seconds between polls of an unreachable node.
+        :param queue: Optional asyncio.Queue receiving NodeUpdate tuples for subscriptions without a callback.
+        """
+        self.device = device
+        self.jitter = jitter
+        self.coalesce_window = coalesce_window
+        self.max_backoff = max_backoff
+        self.queue = queue if queue is not None else asyncio.Queue()
+        self.fetch_count = 0
+        self._subscriptions = []
+        self._failures = {}
+        self._polling = {}
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def subscribe(self, node, attribute, interval, callback=None):
+        """
+        Receive an attribute of a node every interval seconds.
+
+        :param callback: Optional callable taking a NodeUpdate. It may be a coroutine function.
+        :return: The Subscription, which can be passed to unsubscribe().
+        """
+        subscription = Subscription(node, attribute, interval, callback)
+        subscription.next_due = time.monotonic() + random.uniform(0, self.jitter * interval)
+        self._subscriptions.append(subscription)
+        self._wakeup.set()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Stop delivering updates for a subscription.
+        """
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    def start(self):
+        """
+        Start polling in a background task.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        """
+        Stop the background polling task.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        polling = list(self._polling.values())
+        for task in polling:
+            task.cancel()
+        await asyncio.gather(*polling, return_exceptions=True)
+
+    async def run(self):
+        """
+        Poll until cancelled.
+        """
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            for node, subscriptions in self._due_subscriptions(now).items():
+                self._start_poll(node, subscriptions)
+            waiting = [subscription.next_due for subscription in self._subscriptions
+                       if subscription.node not in self._polling]
+            delay = max(min(waiting) - now, 0) if waiting else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _due_subscriptions(self, now):
+        due_nodes = {subscription.node for subscription in self._subscriptions
+                     if subscription.next_due <= now and subscription.node not in self._polling}
+        due = {}
+        for subscription in self._subscriptions:
+            if subscription.node not in due_nodes:
+                continue
+            early = self.coalesce_window * subscription.interval
+            if subscription.next_due - early <= now:
+                due.setdefault(subscription.node, []).append(subscription)
+        return due
+
+    def _start_poll(self, node, subscriptions):
+        task = asyncio.ensure_future(self._poll_node(node, subscriptions))
+        self._polling[node] = task
+
+        def done(_):
+            self._polling.pop(node, None)
+            self._wakeup.set()
+
+        task.add_done_callback(done)
+
+    async def _poll_node(self, node, subscriptions):
+        self.fetch_count += 1
+        try:
+            node_info = await self.device.get_node_info(node)
+        except Exception:
+            _LOGGER.exception("Error polling node %s", node)
+            node_info = None
+        now = time.monotonic()
+        if not node_info:
+            failures = self._failures.get(node, 0) + 1
+            self._failures[node] = failures
+            for subscription in subscriptions:
+                delay = min(subscription.interval * 2 ** failures, self.max_backoff)
+                subscription.next_due = now + delay + random.uniform(0, self.jitter * delay)
+            return
+
+        self._failures.pop(node, None)
+        timestamp = time.time()
+        for subscription in subscriptions:
+            subscription.next_due = now + subscription.interval + random.uniform(0, self.jitter * subscription.interval)
+            update = NodeUpdate(node, subscription.attribute, node_info.get(subscription.attribute), timestamp)
+            await self._deliver(subscription, update)
+
+    async def _deliver(self, subscription, update):
+        if subscription.callback is None:
+            await self.queue.put(update)
+            return
+        try:
+            result = subscription.callback(update)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            _LOGGER.exception("Error in callback of %r", subscription)
@@ -0,0 +1,72 @@
+import time
+from collections import namedtuple
+from .models import is_number
+
+NodeDelta = namedtuple('NodeDelta', ['node', 'field', 'old', 'new', 'timestamp'])
+
+
+class DeltaTracker:
+    """
+    Remember the last reported value of every node field and report only the fields that changed.
+
+    A numeric field with a deadband is reported once it moves at least that far from the last reported value,
+    so slow drift is still reported eventually.
+    """
+
+    def __init__(self, deadbands=None, emit_initial=True):
+        """
+        :param deadbands: Optional dictionary of field name to the minimum numeric change that is reported.
+        :param emit_initial: If True, the first snapshot of a node reports every field with an old value of None.
+        """
+        self.deadbands = dict(deadbands or {})
+        self.emit_initial = emit_initial
+        self._last = {}
+
+    def reset(self, node=None):
+        """
+        Forget the last values of one node, or of every node.
+        """
+        if node is None:
+            self._last.clear()
+        else:
+            self._last.pop(node, None)
+
+    def update(self, node, node_info, timestamp=None):
+        """
+        Compare the node info with the last reported values of the node.
+
+        :return: A list of NodeDelta tuples.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        last = self._last.get(node)
+        if last is None:
+            self._last[node] = dict(node_info)
+            if not self.emit_initial:
+                return []
+            return [NodeDelta(node, field, None, value, timestamp) for field, value in node_info.items()]
+
+        deltas = []
+        for field, new in node_info.items():
+            old = last.get(field)
+            if new == old and field in last:
+                continue
+            deadband = self.deadbands.get(field)
+            if deadband and is_number(new) and is_number(old) and abs(new - old) < deadband:
+                continue
+            last[field] = new
+            deltas.append(NodeDelta(node, field, old, new, timestamp))
+        for field in [field for field in last if field not in node_info]:
+            deltas.append(NodeDelta(node, field, last.pop(field), None, timestamp))
+        return deltas
+
+    def update_snapshot(self, nodes, timestamp=None):
+        """
+        Compare a whole snapshot keyed by node ID, as returned by DucoDevice.get_all_node_info.
+
+        :return: A list of NodeDelta tuples.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        deltas = []
+        for node, node_info in nodes.items():
+            deltas.extend(self.update(node, node_info, timestamp))
+        return deltas
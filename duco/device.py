@@ -1,88 +1,439 @@
+import asyncio
+import logging
+from collections import namedtuple
 import aiohttp
+from ._json import decode_body
+from .adapters import get_adapter, normalize_api_version
+from .cache import TTLCache
+from .deltas import DeltaTracker
+from .metrics import Instrumentation, endpoint_name
+from .models import NodeInfo, field_name, parse_node_info_v1
+from .probe import async_get_api_version
+from .resilience import CircuitBreaker, RttTracker, backoff_delay
+
+DEFAULT_CACHE_TTL = {
+    "board_info": 30.0,
+    "node_list": 30.0,
+    "node_info": 1.0,
+    "node_index": 1.0,
+}
+
+_LOGGER = logging.getLogger(__name__)
+
+WriteResult = namedtuple('WriteResult', ['operation', 'response', 'success', 'attempts', 'verified'])
+
+
+def _copy(value):
+    """
+    Copy decoded JSON data, so callers can change what they get without changing the cached response.
+    """
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
+
+
+def _is_permanent(error):
+    """
+    :return: True if retrying a request that failed with error cannot help: a 4xx status or an undecodable body.
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status < 500
+    return isinstance(error, ValueError)
+
 
 class DucoDevice:
-    def __init__(self, address, port=80, protocol="http", api_version=1.0):
-        self.address = address
-        self.port = port
-        self.protocol = protocol
+    _api_versions = {}
+
+    def __init__(self, address, port=80, protocol="http", api_version=1.0, session=None, connector=None,
+                 pool_size=4, keepalive_timeout=30, cache_ttl=None, cache_size=256, connect_timeout=2, read_timeout=5,
+                 adaptive_timeout=True, retries=1, backoff_base=0.2, backoff_cap=2.0, failure_threshold=5,
+                 reset_timeout=30, instrumentation=None, history=None):
+        """
+        Create a handle for a single Duco device.
+
+        :param session: Optional shared aiohttp.ClientSession. It is never closed by this device.
+        :param connector: Optional shared aiohttp connector used when the device creates its own session.
+        :param pool_size: Maximum number of pooled connections when the device creates its own connector.
+        :param keepalive_timeout: Seconds an idle pooled connection is kept open.
+        :param cache_ttl: Optional dictionary overriding the cache TTL in seconds per endpoint
+            ("board_info", "node_list", "node_info", "node_index"). A TTL of 0 disables caching for that endpoint.
+        :param cache_size: Maximum number of cached responses.
+        :param connect_timeout: Seconds to wait for a connection to the device.
+        :param read_timeout: Seconds to wait for a response. Also the upper bound of the adaptive timeout.
+        :param adaptive_timeout: If True, shorten the read timeout of each endpoint based on the round-trip times
+            observed on that endpoint. The trackers are kept in rtt, keyed by endpoint name.
+        :param retries: Number of retries for a read that times out or fails to connect.
+        :param backoff_base: Base delay in seconds of the exponential backoff between retries.
+        :param backoff_cap: Maximum delay in seconds between retries.
+        :param failure_threshold: Consecutive failed requests after which requests fail fast.
+        :param reset_timeout: Seconds between background probes while requests fail fast.
+        :param instrumentation: Optional Instrumentation receiving request, retry, error and cache events.
+        :param history: Optional HistoryStore that records the readings of every node info fetched.
+        :raises NotImplementedError: If no adapter serves api_version.
+        """
+        self._address = address
+        self._port = port
+        self._protocol = protocol
+        self._base_url = f"{protocol}://{address}:{port}/"
         self.api_version = api_version
+        self.reported_api_version = None
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self._session = session
+        self._connector = connector
+        self._owns_session = session is None
+        self.cache_ttl = dict(DEFAULT_CACHE_TTL, **(cache_ttl or {}))
+        self._cache = TTLCache(maxsize=cache_size)
+        self._inflight = {}
+        self.request_stats = {"requests": 0, "coalesced": 0}
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.adaptive_timeout = adaptive_timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.rtt = {}
+        self.circuit_breaker = CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+        self._probe_task = None
+        self.instrumentation = instrumentation or Instrumentation()
+        self.history = history
+
+    @property
+    def address(self):
+        """
+        The host name or IP address of the device. Use retarget() to change it.
+        """
+        return self._address
+
+    @property
+    def port(self):
+        """
+        The HTTP port of the device. Use retarget() to change it.
+        """
+        return self._port
+
+    @property
+    def protocol(self):
+        """
+        "http" or "https". Use retarget() to change it.
+        """
+        return self._protocol
+
+    def retarget(self, address=None, port=None, protocol=None):
+        """
+        Point this handle at another address, for example after the device got a new DHCP lease.
+
+        Cached responses, round-trip times and the circuit breaker state belong to the old address and are
+        dropped. The session and its connection pool are kept.
+
+        :param address: Optional new host name or IP address.
+        :param port: Optional new port.
+        :param protocol: Optional new protocol.
+        """
+        self._address = self._address if address is None else address
+        self._port = self._port if port is None else port
+        self._protocol = self._protocol if protocol is None else protocol
+        self._base_url = f"{self._protocol}://{self._address}:{self._port}/"
+        self.invalidate_cache()
+        self.rtt.clear()
+        self.circuit_breaker.record_success()
+
+    @property
+    def api_version(self):
+        """
+        The API version whose endpoints are used. Setting it selects the matching ApiAdapter.
+        """
+        return self.adapter.version
+
+    @api_version.setter
+    def api_version(self, api_version):
+        self.adapter = get_adapter(api_version)
+        self._unsupported_endpoints = set()
+
+    @classmethod
+    async def connect(cls, address, port=80, protocol="http", probe_timeout=2, refresh=False, **kwargs):
+        """
+        Create a DucoDevice with its API version detected from the device.
+
+        Both version probes are sent concurrently. The result is remembered per address, so later connects to
+        the same device skip the probes unless refresh is True.
+
+        :param probe_timeout: Time in seconds to wait for the version probes.
+        :param refresh: If True, probe even if the version of this device is already known.
+        :param kwargs: Extra keyword arguments passed to DucoDevice.
+        :return: A DucoDevice using the endpoints of the detected API version.
+        :raises ConnectionError: If the device does not answer either probe.
+        :raises NotImplementedError: If the device reports an unsupported API version.
+        """
+        kwargs.pop("api_version", None)
+        device = cls(address, port=port, protocol=protocol, **kwargs)
+        key = (protocol, address, port)
+        version = None if refresh else cls._api_versions.get(key)
+        if version is None:
+            session = await device.get_session()
+            version = await async_get_api_version(address, session=session, timeout=probe_timeout, port=port,
+                                                  protocol=protocol)
+            if version == 'unknown':
+                await device.close()
+                raise ConnectionError(f"Could not determine the API version of {address}:{port}")
+            cls._api_versions[key] = version
+        api_version = normalize_api_version(version)
+        if api_version is None:
+            await device.close()
+            raise NotImplementedError(f"Unsupported API version {version!r} reported by {address}:{port}")
+        device.api_version = api_version
+        device.reported_api_version = version
+        return device
 
-    async def fetch_json(self, query_string):
+    async def __aenter__(self):
+        await self.get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def get_session(self):
+        """
+        Return the long-lived session used for all requests, creating it on first use.
+
+        :return: An open aiohttp.ClientSession.
+        """
+        if self._session is None or self._session.closed:
+            if self._connector is not None:
+                connector = self._connector
+            else:
+                connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=self.keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, connector_owner=self._connector is None)
+            self._owns_session = True
+        return self._session
+
+    async def close(self):
+        """
+        Close the session if it was created by this device. Injected sessions and connectors are left open.
+        """
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def invalidate_cache(self, node=None):
+        """
+        Drop cached responses.
+
+        :param node: Optional node ID. When given only that node's cached information is dropped.
+        """
+        if node is None:
+            self._cache.invalidate()
+        else:
+            self._cache.invalidate(lambda key: key == ("node_info", node) or key[0] == "node_index")
+
+    async def _cached(self, endpoint, key, fetch):
+        """
+        Read-through helper returning a copy of a cached value or storing the result of fetch().
+        """
+        cache_key = (endpoint,) + key
+        value = self._cache.get(cache_key)
+        self.instrumentation.on_cache(self, endpoint, value is not None)
+        if value is not None:
+            return _copy(value)
+        value = await fetch()
+        if value:
+            self._cache.set(cache_key, value, self.cache_ttl.get(endpoint))
+            return _copy(value)
+        return value
+
+    async def fetch_json(self, query_string, coalesce=True, method="GET", body=None, optional=False, failures=None):
         """
         Fetch JSON data from a URL.
 
+        Concurrent calls for the same query string share one request. request_stats counts the requests sent
+        and the calls that were served by an in-flight request instead. Calls rejected by the open circuit
+        breaker count as neither.
+
         :param query_string: The query string to append to the base URL.
+        :param coalesce: If False, always send a new request and never retry it. Used for writes.
+        :param method: HTTP method. Requests other than GET are never coalesced.
+        :param body: Optional JSON request body.
+        :param optional: If True, the endpoint may not exist on this device. A 404 answer is not an error; it is
+            remembered, so supports_endpoint returns False for the endpoint from then on.
+        :param failures: Optional list that receives the error of a request that fails, such as an
+            aiohttp.ClientResponseError or asyncio.TimeoutError. Only used when coalesce is False.
         :return: Parsed JSON data, or None if the request fails.
         """
-        base_url = f"{self.protocol}://{self.address}:{self.port}/"
-        url = base_url + query_string
-        async with aiohttp.ClientSession() as session:
+        if not self.circuit_breaker.allow_request():
+            endpoint = endpoint_name(query_string)
+            _LOGGER.debug("Skipping request host=%s endpoint=%s: device is unreachable", self.address, endpoint,
+                          extra={"duco_host": self.address, "duco_endpoint": endpoint})
+            self.instrumentation.on_error(self, endpoint, "circuit open")
+            return None
+
+        if not coalesce or method != "GET":
+            self.request_stats["requests"] += 1
+            return await self._request_json(query_string, retries=0, method=method, body=body, optional=optional,
+                                            failures=failures)
+
+        inflight = self._inflight.get(query_string)
+        if inflight is not None:
+            self.request_stats["coalesced"] += 1
+            self.instrumentation.on_coalesced(self, endpoint_name(query_string))
+            return await asyncio.shield(inflight)
+
+        self.request_stats["requests"] += 1
+        inflight = asyncio.ensure_future(self._request_json(query_string, retries=self.retries, optional=optional))
+        self._inflight[query_string] = inflight
+        inflight.add_done_callback(lambda _: self._inflight.pop(query_string, None))
+        return await asyncio.shield(inflight)
+
+    def supports_endpoint(self, query_string):
+        """
+        :return: False if an optional request for the endpoint of query_string was answered with 404 Not Found.
+        """
+        return endpoint_name(query_string) not in self._unsupported_endpoints
+
+    def _rtt_tracker(self, endpoint):
+        tracker = self.rtt.get(endpoint)
+        if tracker is None:
+            tracker = self.rtt[endpoint] = RttTracker()
+        return tracker
+
+    def _request_timeout(self, endpoint):
+        if self.adaptive_timeout:
+            read_timeout = self._rtt_tracker(endpoint).timeout(self.read_timeout)
+        else:
+            read_timeout = self.read_timeout
+        return aiohttp.ClientTimeout(total=None, connect=self.connect_timeout, sock_read=read_timeout)
+
+    async def _request_json(self, query_string, retries=0, method="GET", body=None, optional=False, failures=None):
+        url = self._base_url + query_string
+        endpoint = endpoint_name(query_string)
+        log_extra = {"duco_host": self.address, "duco_endpoint": endpoint}
+        session = await self.get_session()
+        loop = asyncio.get_running_loop()
+        for attempt in range(retries + 1):
+            started = loop.time()
             try:
-                async with session.get(url, timeout=5) as response:
+                async with session.request(method, url, json=body,
+                                           timeout=self._request_timeout(endpoint)) as response:
                     response.raise_for_status()
-                    text = await response.text()
+                    content = await response.read()
+                    content_type = response.content_type
+                break
+            except aiohttp.ClientResponseError as e:
+                # Failed attempts are timed too, so slow and failing devices show up in the metrics
+                self.instrumentation.on_request(self, endpoint, loop.time() - started, 0, e.status)
+                if optional and e.status == 404:
+                    _LOGGER.debug("Endpoint not supported host=%s endpoint=%s", self.address, endpoint,
+                                  extra=log_extra)
+                    self._unsupported_endpoints.add(endpoint)
+                    return None
+                if e.status < 500:
+                    _LOGGER.warning("Error fetching data host=%s endpoint=%s status=%s", self.address, endpoint,
+                                    e.status, extra=log_extra)
+                    self.instrumentation.on_error(self, endpoint, e)
+                    if failures is not None:
+                        failures.append(e)
+                    return None
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.instrumentation.on_request(self, endpoint, loop.time() - started, 0, None)
+                error = e
+            if attempt < retries:
+                self.instrumentation.on_retry(self, endpoint, attempt + 1, error)
+                await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_cap))
+        else:
+            _LOGGER.warning("Error fetching data host=%s endpoint=%s error=%r", self.address, endpoint, error,
+                            extra=log_extra)
+            self.instrumentation.on_error(self, endpoint, error)
+            if failures is not None:
+                failures.append(error)
+            if self.circuit_breaker.record_failure():
+                _LOGGER.warning("Device host=%s is unreachable, failing fast until it answers again", self.address,
+                                extra=log_extra)
+                self._start_probe()
+            return None
 
-                    if "SUCCESS" in text or "FAILED" in text:
-                        returned_data = text.strip()
-                        return {"action_state": returned_data}
-                    elif response.headers.get('content-type') == "application/json; charset=UTF-8":
-                        return await response.json()
-                    else:
-                        print(f"Unexpected content type: {response.headers.get('content-type')}")
-                        return None
+        duration = loop.time() - started
+        self._rtt_tracker(endpoint).record(duration)
+        self.circuit_breaker.record_success()
+        self.instrumentation.on_request(self, endpoint, duration, len(content), response.status)
+
+        try:
+            return decode_body(content, content_type)
+        except ValueError as e:
+            _LOGGER.warning("Error decoding data host=%s endpoint=%s error=%s", self.address, endpoint, e,
+                            extra=log_extra)
+            self.instrumentation.on_error(self, endpoint, e)
+            if failures is not None:
+                failures.append(e)
+            return None
 
-            except aiohttp.ClientError as e:
-                print(f"Error fetching data from {url}: {e}")
-                return None
+    def _start_probe(self):
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.ensure_future(self._probe())
+
+    async def _probe(self):
+        """
+        Probe the device in the background until it answers again, then let requests through.
+        """
+        endpoint = endpoint_name(self.adapter.node_list_path)
+        url = self._base_url + self.adapter.node_list_path
+        session = await self.get_session()
+        attempt = 0
+        while self.circuit_breaker.is_open:
+            await asyncio.sleep(self.circuit_breaker.reset_timeout * (1 + backoff_delay(attempt, 0.5, 1.0)))
+            try:
+                async with session.get(url, timeout=self._request_timeout(endpoint)) as response:
+                    response.raise_for_status()
+                    await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                attempt += 1
+                continue
+            _LOGGER.info("Device host=%s answers again", self.address)
+            self.circuit_breaker.record_success()
+
+    async def get_board_info(self):
+        """
+        Fetch the board information from the Duco device, in the format of its API version.
+
+        :return: A dictionary containing the board information, or None if the request fails.
+        """
+        return await self._cached("board_info", (), lambda: self.fetch_json(self.adapter.board_info_path))
 
     async def get_cap_board_info(self):
         """
-        Fetch the communication and print board information from the Duco device.
+        Fetch the communication and print board information from an API 1.0 Duco device.
 
         :return: A dictionary containing the board information, or None if the request fails.
         """
-        if self.api_version == 1.0:
-            query_string = "board_info"
-            data = await self.fetch_json(query_string)
-            return data
-        else:
-            print(f"Unsupported API version: {self.api_version}")
-            raise NotImplementedError
+        return await self.get_board_info()
 
     async def get_c_board_info(self):
         """
-        Fetch the communication board information from the Duco device.
+        Fetch the communication board information from an API 2.2 Duco device.
 
         :return: A dictionary containing the board information, or None if the request fails.
         """
-        if self.api_version == 2.2:
-            query_string = "info"
-            data = await self.fetch_json(query_string)
-            return data
-        else:
-            print(f"Unsupported API version: {self.api_version}")
-            raise NotImplementedError
-    
+        return await self.get_board_info()
+
     async def get_node_list(self):
         """
         Fetch the node list from the Duco device.
 
         :return: A list of node IDs, or None if the request fails.
         """
-        if self.api_version == 1.0:
-            query_string = "nodelist"
-        else:
-            query_string = "nodes"
-        data = await self.fetch_json(query_string)
-        if isinstance(data, list):
-            if all(isinstance(item, dict) and 'Node' in item for item in data):
-                data = [item['Node'] for item in data]
-            return data
-        elif isinstance(data, dict):
-            return data.get('nodelist', [])
-        else:
-            print("Unexpected data format")
-            return []
+        return await self._cached("node_list", (), self._fetch_node_list)
+
+    async def _fetch_node_list(self):
+        data = await self.fetch_json(self.adapter.node_list_path)
+        if data is None:
+            return None
+        if not isinstance(data, (list, dict)):
+            _LOGGER.warning("Unexpected data format from host=%s", self.address)
+        return self.adapter.parse_node_list(data)
 
     async def get_node_info(self, node_id):
         """
@@ -90,43 +441,90 @@ class DucoDevice:
 
         :return: A dictionary containing the node information, or None if the request fails.
         """
-        if self.api_version == 1.0:
-            query_string = f"nodeinfoget?node={node_id}"
-        else:
-            query_string = f"info/nodes/{node_id}"
-        data = await self.fetch_json(query_string)
-        if self.api_version == 1.0:
-            return data
-        elif self.api_version == 2.2:
-            if isinstance(data, dict):
-                node_info = {
-                    "node": data.get("Node"),
-                    "devtype": data.get("General", {}).get("Type", {}).get("Val"),
-                    "subtype": data.get("General", {}).get("SubType", {}).get("Val"),
-                    "netw": data.get("General", {}).get("NetworkType", {}).get("Val"),
-                    "prnt": data.get("General", {}).get("Parent", {}).get("Val"),
-                    "asso": data.get("General", {}).get("Asso", {}).get("Val"),
-                    "location": data.get("General", {}).get("Name", {}).get("Val"),
-                    "identify": data.get("General", {}).get("Identify", {}).get("Val"),
-                    "ventilation_state": data.get("Ventilation", {}).get("State", {}).get("Val"),
-                    "ventilation_time_state_remain": data.get("Ventilation", {}).get("TimeStateRemain", {}).get("Val"),
-                    "ventilation_time_state_end": data.get("Ventilation", {}).get("TimeStateEnd", {}).get("Val"),
-                    "ventilation_mode": data.get("Ventilation", {}).get("Mode", {}).get("Val"),
-                    "ventilation_flow_lvl_tgt": data.get("Ventilation", {}).get("FlowLvlTgt", {}).get("Val"),
-                }
-                # Check if sensor information is available
-                sensor_data = data.get("Sensor", {})
-                for sensor_key, sensor_value in sensor_data.items():
-                    if isinstance(sensor_value, dict) and "Val" in sensor_value:
-                        node_info[sensor_key.lower()] = sensor_value["Val"]
-                return node_info
+        return await self._cached("node_info", (node_id,), lambda: self._fetch_node_info(node_id))
+
+    def _record_history(self, node_id, node_info):
+        if self.history is not None and isinstance(node_info, dict):
+            self.history.record(node_id, node_info)
+
+    async def _fetch_node_info(self, node_id):
+        data = await self.fetch_json(self.adapter.node_info_path(node_id))
+        node_info = self.adapter.parse_node_info(data)
+        if node_info is None and data is not None:
+            _LOGGER.warning("Unexpected data format from host=%s", self.address)
+        self._record_history(node_id, node_info)
+        return node_info
+
+    async def get_node_record(self, node_id):
+        """
+        Fetch the node information from the Duco device as a typed record.
+
+        :return: A NodeInfo, or None if the request fails.
+        """
+        node_info = await self.get_node_info(node_id)
+        return self.adapter.node_record(node_info) if node_info else None
+
+    async def get_all_node_info(self, max_concurrency=4):
+        """
+        Fetch the information of every node on the Duco device concurrently.
+
+        When the API has a bulk node info endpoint it is tried first, falling back to one request per node. A device
+        that answers the bulk endpoint with 404 Not Found is sent one request per node from then on.
+
+        :param max_concurrency: Maximum number of node requests in flight at once.
+        :return: A tuple of (nodes, errors), both dictionaries keyed by node ID.
+        :raises ConnectionError: If the node list cannot be fetched.
+        """
+        nodes = {}
+        errors = {}
+        async for node, node_info, error in self.iter_all_node_info(max_concurrency=max_concurrency):
+            if error is None:
+                nodes[node] = node_info
             else:
-                print("Unexpected data format")
-            return None
-        else:
-            print(f"Unsupported API version: {self.api_version}")
-            return None
-    
+                errors[node] = error
+        return nodes, errors
+
+    async def iter_all_node_info(self, max_concurrency=4):
+        """
+        Fetch the information of every node on the Duco device concurrently, yielding each node as it arrives.
+
+        :param max_concurrency: Maximum number of node requests in flight at once.
+        :return: An async iterator of (node, node_info, error) tuples. Exactly one of node_info and error is None.
+        :raises ConnectionError: If the node list cannot be fetched.
+        """
+        adapter = self.adapter
+        if adapter.bulk_node_info_path is not None and self.supports_endpoint(adapter.bulk_node_info_path):
+            bulk = adapter.parse_bulk_node_info(await self.fetch_json(adapter.bulk_node_info_path, optional=True))
+            if bulk is not None:
+                for node, node_info in bulk:
+                    self._record_history(node, node_info)
+                    self._cache.set(("node_info", node), node_info, self.cache_ttl.get("node_info"))
+                    yield node, _copy(node_info), None
+                return
+
+        node_list = await self.get_node_list()
+        if node_list is None:
+            raise ConnectionError(f"Could not fetch the node list of {self.address}:{self.port}")
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(node):
+            async with semaphore:
+                try:
+                    node_info = await self.get_node_info(node)
+                except Exception as e:
+                    return node, None, e
+            if node_info is None:
+                return node, None, "No data returned"
+            return node, node_info, None
+
+        tasks = [asyncio.ensure_future(fetch(node)) for node in node_list]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            for task in tasks:
+                task.cancel()
+
     async def get_node_attribute_value(self, node, attribute):
         """
         Fetch the attribute values from the Duco device.
@@ -136,21 +534,63 @@ class DucoDevice:
         node_info = await self.get_node_info(node)
         return node_info.get(attribute, None) if node_info else None
     
+    async def watch_deltas(self, interval=5, deadbands=None, max_concurrency=4):
+        """
+        Poll every node and yield only the fields that changed since the last poll.
+
+        Every call keeps its own last values, so concurrent watchers of the same device each see every change and
+        the first poll reports every field. A poll that cannot fetch the node list is logged and skipped.
+
+        :param interval: Time in seconds between polls.
+        :param deadbands: Optional dictionary of field name to the minimum numeric change that is reported.
+        :param max_concurrency: Maximum number of node requests in flight at once.
+        :return: An async iterator of NodeDelta tuples.
+        """
+        tracker = DeltaTracker(deadbands)
+        while True:
+            try:
+                nodes, _ = await self.get_all_node_info(max_concurrency=max_concurrency)
+            except ConnectionError as e:
+                _LOGGER.warning("%s", e)
+                nodes = {}
+            for delta in tracker.update_snapshot(nodes):
+                yield delta
+            await asyncio.sleep(interval)
+
+    async def get_node_index(self, max_concurrency=4):
+        """
+        Classify every node on the Duco device from a single concurrent snapshot.
+
+        :param max_concurrency: Maximum number of node requests in flight at once.
+        :return: A dictionary with "netw" and "devtype" keys, each mapping a type to a list of node IDs.
+        :raises ConnectionError: If the node list cannot be fetched.
+        """
+        return await self._cached("node_index", (), lambda: self._build_node_index(max_concurrency))
+
+    async def _build_node_index(self, max_concurrency):
+        nodes, _ = await self.get_all_node_info(max_concurrency=max_concurrency)
+        node_index = {"netw": {}, "devtype": {}}
+        for node, node_info in nodes.items():
+            for field in ("netw", "devtype"):
+                node_index[field].setdefault(node_info.get(field), []).append(node)
+        return node_index
+
     async def get_node_types(self, node_type):
         """
         Fetch the nodes of a specific type from the Duco device.
 
         :return: A list of node IDs, or None if the request fails.
         """
-        node_list = await self.get_node_list()
-        node_type_match = []
-        for node in node_list:
-            if await self.get_node_attribute_value(node, 'netw') == node_type:
-                node_type_match.append(node)
+        try:
+            node_index = await self.get_node_index()
+        except ConnectionError as e:
+            _LOGGER.warning("%s", e)
+            return None
+        node_type_match = node_index["netw"].get(node_type, [])
         if node_type_match:
             return node_type_match
         else:
-            print(f"No {node_type} nodes found")
+            _LOGGER.info("No %s nodes found", node_type)
             return None
     
     async def get_wireless_nodes(self):
@@ -184,15 +624,12 @@ class DucoDevice:
         :return: A list of valid sensor IDs, or None if the request fails.
         """
         node_info = await self.get_node_info(node)
-        valid_sensors = []
-        if node_info:
-            for key, value in node_info.items():
-                if key not in ("node", "devtype", "subtype", "netw", "addr", "sub", "prnt", "asso", "location", "error", "show", "link", "serialnb", "swversion", "cntdwn", "endtime") and value not in ("-", 0):
-                    valid_sensors.append(key)
+        # Keep the names of get_node_info, so every sensor can be passed to get_node_key_value
+        valid_sensors = NodeInfo.from_dict(node_info).sensors() if node_info else []
         if valid_sensors:
             return valid_sensors
         else:
-            print("No valid sensors found")
+            _LOGGER.info("No valid sensors found for node %s", node)
             return None
 
     async def get_node_key_value(self, node, key):
@@ -205,7 +642,7 @@ class DucoDevice:
         if value:
             return value
         else:
-            print(f"No value found for {key}")
+            _LOGGER.info("No value found for %s on node %s", key, node)
             return None
         
     async def set_node_parameters(self, node, key, value):
@@ -214,9 +651,7 @@ class DucoDevice:
 
         :return: The response from the device, or None if the request fails.
         """
-        query_string = f"nodeinfoset?node={node}&para={key}&value={value}"
-        data = await self.fetch_json(query_string)
-        return data
+        return await self._write(node, self.adapter.parameter_request(node, key, value))
 
     async def set_node_operational_state(self, node, state):
         """
@@ -224,12 +659,13 @@ class DucoDevice:
 
         :return: The response from the device, or None if the request fails.
         """
-        query_string = f"nodesetoperstate?node={node}&value={state}"
-        set_status = await self.fetch_json(query_string)
-        if set_status.get('action_state') == "SUCCESS":
-            return set_status
-        else:
-            return set_status
+        return await self._write(node, self.adapter.operational_state_request(node, state))
+
+    async def _write(self, node, request, failures=None):
+        method, query_string, body = request
+        data = await self.fetch_json(query_string, coalesce=False, method=method, body=body, failures=failures)
+        self.invalidate_cache(node)
+        return self.adapter.parse_write_response(data)
 
     async def set_node_location(self, node, location):
         """
@@ -237,4 +673,70 @@ class DucoDevice:
 
         :return: The response from the device, or None if the request fails.
         """
-        return await self.set_node_parameters(node, "location", location)
\ No newline at end of file
+        return await self.set_node_parameters(node, "location", location)
+
+    async def set_nodes_batch(self, operations, max_concurrency=2, retries=2, retry_delay=0.5, verify=False):
+        """
+        Apply many writes to the Duco device.
+
+        Operations on the same node run in the given order, different nodes run concurrently. A write that times
+        out, cannot connect or gets a 5xx status is retried; a FAILED reply or a rejected request is not.
+
+        :param operations: List of (node, key, value) parameter writes and (node, state) operational state writes.
+        :param max_concurrency: Maximum number of nodes written at once.
+        :param retries: Number of retries for a write that failed for a transient reason.
+        :param retry_delay: Initial delay in seconds between retries, doubled after every attempt.
+        :param verify: If True, read back every node with one snapshot and check the written values.
+        :return: A list of WriteResult tuples in the order of operations.
+        """
+        results = [None] * len(operations)
+        by_node = {}
+        for index, operation in enumerate(operations):
+            by_node.setdefault(operation[0], []).append(index)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def write(operation):
+            if len(operation) == 3:
+                request = self.adapter.parameter_request(*operation)
+            else:
+                request = self.adapter.operational_state_request(*operation)
+            for attempt in range(1, retries + 2):
+                failures = []
+                response = await self._write(operation[0], request, failures)
+                if response is not None or attempt > retries or any(_is_permanent(e) for e in failures):
+                    break
+                await asyncio.sleep(retry_delay * 2 ** (attempt - 1))
+            success = response is not None and response.get("action_state") != "FAILED"
+            return WriteResult(operation, response, success, attempt, None)
+
+        async def write_node(indexes):
+            async with semaphore:
+                for index in indexes:
+                    results[index] = await write(operations[index])
+
+        await asyncio.gather(*(write_node(indexes) for indexes in by_node.values()))
+        if verify:
+            results = await self._verify_writes(results)
+        return results
+
+    async def _verify_writes(self, results):
+        self.invalidate_cache()
+        try:
+            nodes, _ = await self.get_all_node_info()
+        except ConnectionError as e:
+            _LOGGER.warning("Could not verify writes: %s", e)
+            nodes = {}
+        verified = []
+        for result in results:
+            if not result.success:
+                verified.append(result)
+                continue
+            operation = result.operation
+            node_info = parse_node_info_v1(nodes.get(operation[0]) or {})
+            if len(operation) == 3:
+                key, expected = field_name(operation[1]), operation[2]
+            else:
+                key, expected = "ventilation_state", operation[1]
+            actual = node_info.get(key)
+            verified.append(result._replace(verified=actual is not None and str(actual) == str(expected)))
+        return verified
@@ -1,6 +1,22 @@
-from zeroconf import ServiceBrowser, Zeroconf
+from zeroconf import ServiceBrowser, ServiceStateChange, Zeroconf
+from zeroconf.asyncio import AsyncServiceBrowser, AsyncServiceInfo, AsyncZeroconf
+from collections import namedtuple
+import asyncio
+import logging
 import time
+import aiohttp
 import requests
+from .probe import async_get_api_version
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_TYPE = "_http._tcp.local."
+
+DEVICE_ADDED = "added"
+DEVICE_UPDATED = "updated"
+DEVICE_REMOVED = "removed"
+
+DiscoveryEvent = namedtuple('DiscoveryEvent', ['event', 'device'])
 
 class DucoListener:
     def __init__(self, debug=False):
@@ -11,49 +27,49 @@ class DucoListener:
     def add_service(self, zeroconf, type, name):
         info = zeroconf.get_service_info(type, name)
         
-        if info:
-            api_version = get_api_version(info.address, self.debug)
-            
-            device_info = {
-                'name': info.name,
-                'address': '.'.join(map(str, info.addresses[0])),
-                'port': info.port,
-                'server': info.server,
-                'api_version': api_version
-            }
+        if info and info.addresses:
+            device_info = _build_device_info(info, None)
+            device_info['api_version'] = get_api_version(device_info['address'], self.debug)
 
             if self.debug:
-                print(f"Found device: {device_info}")
+                _LOGGER.debug("Found device: %s", device_info)
 
             if "DUCO" in device_info['name']:
                 self.devices.append(device_info)
-                print(f"Found DUCO device: {device_info}")
+                _LOGGER.info("Found DUCO device: %s", device_info)
 
     def update_service(self, zeroconf, type, name):
         pass
 
-def get_api_version(ip, debug=False):
+def _build_device_info(info, api_version):
+    return {
+        'name': info.name,
+        'address': '.'.join(map(str, info.addresses[0])),
+        'port': info.port,
+        'server': info.server,
+        'api_version': api_version
+    }
+
+def get_api_version(ip, debug=False, timeout=5):
     try:
-        response = requests.get(f"http://{ip}/info")
+        response = requests.get(f"http://{ip}/info", timeout=timeout)
         if response.status_code == 200:
             data = response.json()
             version = data.get('General', {}).get('Board', {}).get('PublicApiVersion', {}).get('Val', 'unknown')
             if debug:
-                print(response)
-                print(data)
-                print(version)
+                _LOGGER.debug("Version probe of %s: %s %s -> %s", ip, response, data, version)
         elif response.status_code == 404:
-            response = requests.get(f"http://{ip}/boxinfoget")
+            response = requests.get(f"http://{ip}/boxinfoget", timeout=timeout)
             # Todo do more here to get information that its a v1
             if debug:
-                print(response)
+                _LOGGER.debug("Version probe of %s: %s", ip, response)
             if response.status_code == 200:
                 version = '1.0'
         else:
             version = 'unknown'
     except requests.RequestException as e:
         if debug:
-            print(f"Error fetching version info: {e}")
+            _LOGGER.debug("Error fetching version info from %s: %s", ip, e)
         version = 'unknown'
     
     return version
@@ -63,19 +79,133 @@ def discover_duco_devices(timeout=5, debug=False, zeroconf_instance=None):
     Discover Duco devices on the local network.
 
     :param timeout: Time in seconds to wait for discovery. Default is 5 seconds.
-    :param debug: If True, print all discovered devices. Default is False.
+    :param debug: If True, log all discovered devices at debug level. Default is False.
     :param zeroconf_instance: Optional Zeroconf instance. If not provided, a new one will be created.
     :return: List of discovered Duco devices.
     """
     zeroconf = zeroconf_instance or Zeroconf()
     listener = DucoListener(debug=debug)
-    browser = ServiceBrowser(zeroconf, "_http._tcp.local.", listener)
+    browser = ServiceBrowser(zeroconf, SERVICE_TYPE, listener)
 
     try:
-        print(f"Searching for devices for {timeout} seconds...")
+        _LOGGER.info("Searching for devices for %s seconds...", timeout)
         time.sleep(timeout)
     finally:
         if zeroconf_instance is None:
             zeroconf.close()
     
-    return listener.devices
\ No newline at end of file
+    return listener.devices
+
+async def async_stream_duco_devices(timeout=None, debug=False, aiozc=None, session=None):
+    """
+    Stream Duco devices on the local network as they appear, change or disappear.
+
+    Yields a DiscoveryEvent for every change: DEVICE_ADDED once a device is resolved, DEVICE_UPDATED when its
+    address or port changes, and DEVICE_REMOVED when it goes offline.
+
+    :param timeout: Optional time in seconds after which the stream ends. Runs indefinitely when None.
+    :param debug: If True, log every service state change at debug level. Default is False.
+    :param aiozc: Optional AsyncZeroconf instance. If not provided, a new one will be created.
+    :param session: Optional aiohttp.ClientSession used for the version probes.
+    :return: An async iterator of DiscoveryEvent tuples.
+    """
+    owns_aiozc = aiozc is None
+    aiozc = aiozc or AsyncZeroconf()
+    owns_session = session is None
+    session = session or aiohttp.ClientSession()
+    queue = asyncio.Queue()
+    known = {}
+    # Name -> resolve task in flight. A newer announcement of the same name replaces the older resolve.
+    resolving = {}
+
+    async def resolve(service_type, name):
+        info = AsyncServiceInfo(service_type, name)
+        if not await info.async_request(aiozc.zeroconf, 3000) or not info.addresses:
+            return
+        address = '.'.join(map(str, info.addresses[0]))
+        previous = known.get(name)
+        if previous is not None and previous['address'] == address and previous['port'] == info.port:
+            return
+        if previous is not None and previous['address'] == address:
+            api_version = previous['api_version']
+        else:
+            api_version = await async_get_api_version(address, session=session, debug=debug)
+        device_info = _build_device_info(info, api_version)
+        known[name] = device_info
+        queue.put_nowait(DiscoveryEvent(DEVICE_ADDED if previous is None else DEVICE_UPDATED, device_info))
+
+    def on_service_state_change(zeroconf, service_type, name, state_change):
+        if debug:
+            _LOGGER.debug("Service %s %s", name, state_change)
+        if "DUCO" not in name:
+            return
+        previous_task = resolving.pop(name, None)
+        if previous_task is not None:
+            previous_task.cancel()
+        if state_change is ServiceStateChange.Removed:
+            device_info = known.pop(name, None)
+            if device_info is not None:
+                queue.put_nowait(DiscoveryEvent(DEVICE_REMOVED, device_info))
+        else:
+            task = resolving[name] = asyncio.ensure_future(resolve(service_type, name))
+            task.add_done_callback(lambda done: forget(name, done))
+
+    def forget(name, task):
+        if resolving.get(name) is task:
+            del resolving[name]
+
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    browser = AsyncServiceBrowser(aiozc.zeroconf, SERVICE_TYPE, handlers=[on_service_state_change])
+    try:
+        while True:
+            if deadline is None:
+                event = await queue.get()
+            else:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            yield event
+    finally:
+        await browser.async_cancel()
+        tasks = list(resolving.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if owns_session:
+            await session.close()
+        if owns_aiozc:
+            await aiozc.async_close()
+
+async def async_discover_duco_devices(timeout=5, debug=False, expected_count=None, aiozc=None, session=None):
+    """
+    Discover Duco devices on the local network without blocking the event loop.
+
+    API versions of the discovered devices are probed concurrently while the scan is running.
+
+    :param timeout: Maximum time in seconds to wait for discovery. Default is 5 seconds.
+    :param debug: If True, log all discovered devices at debug level. Default is False.
+    :param expected_count: Optional number of devices after which discovery returns early.
+    :param aiozc: Optional AsyncZeroconf instance. If not provided, a new one will be created.
+    :param session: Optional aiohttp.ClientSession used for the version probes.
+    :return: List of discovered Duco devices.
+    """
+    devices = {}
+    stream = async_stream_duco_devices(timeout=timeout, debug=debug, aiozc=aiozc, session=session)
+    _LOGGER.info("Searching for devices for up to %s seconds...", timeout)
+    try:
+        async for event in stream:
+            if event.event != DEVICE_ADDED or event.device['name'] in devices:
+                continue
+            devices[event.device['name']] = event.device
+            _LOGGER.info("Found DUCO device: %s", event.device)
+            if expected_count is not None and len(devices) >= expected_count:
+                break
+    finally:
+        await stream.aclose()
+
+    return list(devices.values())
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import os
+import aiohttp
+from .adapters import get_adapter
+from .discovery import DEVICE_ADDED, async_discover_duco_devices, async_stream_duco_devices
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "pyduco", "devices.json")
+CACHE_FORMAT_VERSION = 1
+CACHED_FIELDS = ('name', 'address', 'port', 'server', 'api_version', 'board_serial')
+
+
+class DiscoveryCache:
+    """
+    A small JSON file holding the devices found by a previous discovery.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+
+    def load(self):
+        """
+        Load the cached devices.
+
+        :return: List of cached device dictionaries. Empty if the file is missing or unreadable.
+        """
+        try:
+            with open(self.path) as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return []
+        if not isinstance(data, dict) or data.get('version') != CACHE_FORMAT_VERSION:
+            return []
+        return [device for device in data.get('devices', []) if isinstance(device, dict) and 'address' in device]
+
+    def save(self, devices):
+        """
+        Atomically replace the cache file with the given devices.
+
+        :param devices: List of device dictionaries.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        records = [{field: device.get(field) for field in CACHED_FIELDS} for device in devices]
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as cache_file:
+            json.dump({'version': CACHE_FORMAT_VERSION, 'devices': records}, cache_file, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+async def async_get_board_serial(device, session, timeout=2):
+    """
+    Fetch the communication board serial of a device with a single request.
+
+    :param device: Device dictionary with address, port and api_version.
+    :param session: aiohttp.ClientSession to use.
+    :param timeout: Time in seconds to wait for the device.
+    :return: The board serial, or None if the device did not answer.
+    """
+    try:
+        adapter = get_adapter(device.get('api_version'))
+    except NotImplementedError:
+        return None
+    url = f"http://{device['address']}:{device.get('port') or 80}/{adapter.board_info_path}"
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            if response.status != 200:
+                return None
+            return adapter.parse_board_serial(await response.json(content_type=None))
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, AttributeError):
+        return None
+
+
+async def async_validate_device(device, session, timeout=2):
+    """
+    Check that a cached device still answers at its address with the same board serial.
+
+    :return: True if the cached entry is still valid.
+    """
+    serial = await async_get_board_serial(device, session, timeout=timeout)
+    return serial is not None and serial == device.get('board_serial')
+
+
+async def _async_add_board_serials(devices, session):
+    serials = await asyncio.gather(*(async_get_board_serial(device, session) for device in devices))
+    for device, serial in zip(devices, serials):
+        device['board_serial'] = serial
+    return devices
+
+
+async def _async_rediscover(cache, fresh, stale, timeout, debug, session):
+    wanted = {device.get('name') for device in stale}
+    found = []
+    stream = async_stream_duco_devices(timeout=timeout, debug=debug, session=session)
+    try:
+        async for event in stream:
+            if event.event == DEVICE_ADDED and event.device['name'] in wanted:
+                found.append(event.device)
+                wanted.discard(event.device['name'])
+                if not wanted:
+                    break
+    finally:
+        await stream.aclose()
+    await _async_add_board_serials(found, session)
+    cache.save(fresh + found)
+    return found
+
+
+async def async_load_duco_devices(path=DEFAULT_CACHE_PATH, timeout=5, debug=False, session=None):
+    """
+    Load Duco devices from the on-disk cache, falling back to a full discovery when it is empty.
+
+    Every cached entry is revalidated with one request. Entries that no longer answer are rediscovered in a
+    background task, which rewrites the cache when it completes.
+
+    :param path: Location of the cache file.
+    :param timeout: Time in seconds to spend on discovery or rediscovery.
+    :param debug: If True, log discovery details at debug level. Default is False.
+    :param session: Optional aiohttp.ClientSession used for all requests. It must stay open until the
+        rediscovery task is done.
+    :return: A tuple of (devices, rediscovery_task). The task is None when every entry was valid, otherwise it
+        resolves to the list of rediscovered devices.
+    """
+    cache = DiscoveryCache(path)
+    cached = cache.load()
+    owns_session = session is None
+    session = session or aiohttp.ClientSession()
+
+    if not cached:
+        try:
+            devices = await async_discover_duco_devices(timeout=timeout, debug=debug, session=session)
+            await _async_add_board_serials(devices, session)
+        finally:
+            if owns_session:
+                await session.close()
+        cache.save(devices)
+        return devices, None
+
+    results = await asyncio.gather(*(async_validate_device(device, session) for device in cached))
+    fresh = [device for device, valid in zip(cached, results) if valid]
+    stale = [device for device, valid in zip(cached, results) if not valid]
+    if not stale:
+        if owns_session:
+            await session.close()
+        return fresh, None
+
+    async def rediscover():
+        try:
+            return await _async_rediscover(cache, fresh, stale, timeout, debug, session)
+        finally:
+            if owns_session:
+                await session.close()
+
+    return fresh, asyncio.ensure_future(rediscover())
@@ -0,0 +1,106 @@
+from .models import SKIPPED_FIELDS, is_number, parse_node_info_v1
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+BACKENDS = ("numpy", "arrow", "list")
+
+
+def _rows(snapshots):
+    for host, nodes in snapshots.items():
+        for node, node_info in nodes.items():
+            if node_info:
+                yield host, node, parse_node_info_v1(node_info)
+
+
+def sensor_fields(snapshots):
+    """
+    :return: The sorted names of the fields that hold a numeric reading on at least one node.
+    """
+    fields = set()
+    for _, _, node_info in _rows(snapshots):
+        fields.update(field for field, value in node_info.items()
+                      if field not in SKIPPED_FIELDS and is_number(value))
+    return sorted(fields)
+
+
+def snapshot_to_columns(snapshots, fields=None, backend=None):
+    """
+    Turn node snapshots of many devices into one aligned column per field, with one row per node.
+
+    Every result has a "host" and a "node" column followed by one float column per field. API 1.0 fields are
+    exported under the names they share with API 2.2, such as "ventilation_flow_lvl_tgt" for "trgt". A node
+    without a numeric value for a field has that value masked: a masked array entry with NumPy, a null with Arrow
+    and None with plain lists.
+
+    :param snapshots: Dictionary mapping a device label, such as "address:port", to a dictionary of node info
+        keyed by node ID, as returned by DucoDevice.get_all_node_info.
+    :param fields: Optional list of fields to export. By default every field with a numeric reading is exported.
+    :param backend: "numpy" for a dictionary of NumPy masked arrays, "arrow" for a pyarrow.Table or "list" for a
+        dictionary of lists. By default NumPy is used when installed.
+    :return: The columns in the chosen backend.
+    :raises ValueError: If the backend is unknown.
+    :raises ImportError: If the backend is not installed.
+    """
+    if backend is None:
+        backend = "numpy" if numpy is not None else "list"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    if backend == "arrow" and pyarrow is None:
+        raise ImportError("The arrow backend needs pyarrow")
+    if backend == "numpy" and numpy is None:
+        raise ImportError("The numpy backend needs numpy")
+
+    fields = sensor_fields(snapshots) if fields is None else list(fields)
+    hosts = []
+    nodes = []
+    values = [[] for _ in fields]
+    for host, node, node_info in _rows(snapshots):
+        hosts.append(host)
+        nodes.append(node)
+        for field, column in zip(fields, values):
+            value = node_info.get(field)
+            column.append(float(value) if is_number(value) else None)
+
+    if backend == "arrow":
+        arrays = {"host": pyarrow.array(hosts, type=pyarrow.string()), "node": pyarrow.array(nodes)}
+        arrays.update((field, pyarrow.array(column, type=pyarrow.float64())) for field, column in zip(fields, values))
+        return pyarrow.table(arrays)
+    if backend == "numpy":
+        result = {"host": numpy.array(hosts, dtype=object), "node": numpy.array(nodes)}
+        for field, column in zip(fields, values):
+            # None becomes NaN in a float array, which is then masked
+            array = numpy.array(column, dtype=float)
+            result[field] = numpy.ma.MaskedArray(array, mask=numpy.isnan(array))
+        return result
+    result = {"host": hosts, "node": nodes}
+    result.update(zip(fields, values))
+    return result
+
+
+async def async_fleet_columns(fleet, fields=None, backend=None, max_concurrency=4, timeout=None):
+    """
+    Snapshot every device of a DucoFleet concurrently and export all nodes as aligned columns.
+
+    :param fleet: The DucoFleet to snapshot.
+    :param max_concurrency: Maximum number of node requests in flight per device.
+    :param timeout: Time in seconds a single device may take. Defaults to the fleet timeout.
+    :return: A tuple of (columns, errors). Columns are labelled with "address:port" hosts, as returned by
+        snapshot_to_columns. Errors maps the label of every device that failed to its exception.
+    """
+    snapshots = {}
+    errors = {}
+    async for result in fleet.snapshot_all(max_concurrency=max_concurrency, timeout=timeout):
+        label = f"{result.device.address}:{result.device.port}"
+        if result.error is not None:
+            errors[label] = result.error
+        else:
+            snapshots[label] = result.result[0]
+    return snapshot_to_columns(snapshots, fields=fields, backend=backend), errors
@@ -0,0 +1,117 @@
+import asyncio
+from collections import namedtuple
+import aiohttp
+from .device import DucoDevice
+
+FleetResult = namedtuple('FleetResult', ['device', 'result', 'error'])
+
+
+class DucoFleet:
+    """
+    Many Duco devices sharing one connection pool.
+
+    The shared connector caps the number of concurrent requests across the fleet and per box. Fan-out calls
+    yield results as each box finishes, so one slow or dead box never holds back the rest.
+    """
+
+    def __init__(self, limit=64, limit_per_host=2, timeout=30, keepalive_timeout=30):
+        """
+        :param limit: Maximum number of concurrent requests across all devices.
+        :param limit_per_host: Maximum number of concurrent requests to a single device.
+        :param timeout: Default time in seconds a single device may take for one fan-out call.
+        :param keepalive_timeout: Seconds an idle pooled connection is kept open.
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.devices = []
+        self._connector = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @property
+    def connector(self):
+        """
+        The connector shared by every device, created on first use inside the running event loop.
+        """
+        if self._connector is None or self._connector.closed:
+            self._connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                                   keepalive_timeout=self.keepalive_timeout)
+        return self._connector
+
+    def add_device(self, address, port=80, protocol="http", api_version=1.0, **kwargs):
+        """
+        Add a device to the fleet. Must be called while an event loop is running.
+
+        :param kwargs: Extra keyword arguments passed to DucoDevice.
+        :return: The new DucoDevice.
+        """
+        device = DucoDevice(address, port=port, protocol=protocol, api_version=float(api_version),
+                            connector=self.connector, **kwargs)
+        self.devices.append(device)
+        return device
+
+    def add_discovered_devices(self, devices, **kwargs):
+        """
+        Add the devices returned by discovery, skipping those with an unknown API version.
+
+        :return: List of the added DucoDevice objects.
+        """
+        added = []
+        for device_info in devices:
+            try:
+                api_version = float(device_info['api_version'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            added.append(self.add_device(device_info['address'], port=device_info.get('port') or 80,
+                                         api_version=api_version, **kwargs))
+        return added
+
+    async def close(self):
+        """
+        Close every device and the shared connector.
+        """
+        await asyncio.gather(*(device.close() for device in self.devices))
+        if self._connector is not None:
+            await self._connector.close()
+            self._connector = None
+
+    async def map(self, func, timeout=None):
+        """
+        Run func(device) for every device concurrently and yield results as they complete.
+
+        :param func: Coroutine function taking a DucoDevice.
+        :param timeout: Time in seconds a single device may take. Defaults to the fleet timeout.
+        :return: An async iterator of FleetResult tuples. Failed devices carry the exception in error.
+        """
+        timeout = self.timeout if timeout is None else timeout
+
+        async def run(device):
+            try:
+                return FleetResult(device, await asyncio.wait_for(func(device), timeout), None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                return FleetResult(device, None, e)
+
+        tasks = [asyncio.ensure_future(run(device)) for device in self.devices]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def snapshot_all(self, max_concurrency=4, timeout=None):
+        """
+        Fetch every node on every device.
+
+        :return: An async iterator of FleetResult tuples whose result is the (nodes, errors) tuple of
+            DucoDevice.get_all_node_info.
+        """
+        return self.map(lambda device: device.get_all_node_info(max_concurrency=max_concurrency), timeout=timeout)
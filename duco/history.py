@@ -0,0 +1,190 @@
+import time
+from array import array
+from .models import SKIPPED_FIELDS, is_number
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class RingBuffer:
+    """
+    Fixed-capacity buffer of (timestamp, value) pairs stored as two flat float arrays.
+
+    Once full, every append overwrites the oldest sample.
+    """
+
+    __slots__ = ("capacity", "_times", "_values", "_next", "_size", "_numpy")
+
+    def __init__(self, capacity, use_numpy=None):
+        self.capacity = capacity
+        self._numpy = numpy is not None if use_numpy is None else use_numpy
+        if self._numpy:
+            self._times = numpy.zeros(capacity)
+            self._values = numpy.zeros(capacity)
+        else:
+            self._times = array('d', bytes(8 * capacity))
+            self._values = array('d', bytes(8 * capacity))
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        return 2 * 8 * self.capacity
+
+    def append(self, timestamp, value):
+        self._times[self._next] = timestamp
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _ordered(self, data):
+        if self._size < self.capacity:
+            return data[:self._size]
+        if self._numpy:
+            return numpy.concatenate((data[self._next:], data[:self._next]))
+        return data[self._next:] + data[:self._next]
+
+    def series(self, since=None, until=None):
+        """
+        :return: A (timestamps, values) tuple in chronological order, as NumPy arrays or array('d').
+        """
+        times = self._ordered(self._times)
+        values = self._ordered(self._values)
+        if since is None and until is None:
+            return (times.copy() if self._numpy else times), (values.copy() if self._numpy else values)
+        if self._numpy:
+            mask = numpy.ones(len(times), dtype=bool)
+            if since is not None:
+                mask &= times >= since
+            if until is not None:
+                mask &= times < until
+            return times[mask], values[mask]
+        keep = [index for index, timestamp in enumerate(times)
+                if (since is None or timestamp >= since) and (until is None or timestamp < until)]
+        return array('d', (times[index] for index in keep)), array('d', (values[index] for index in keep))
+
+
+class HistoryStore:
+    """
+    Bounded in-memory history of numeric node readings, one ring buffer per node and sensor.
+
+    Memory use is capped at max_series * capacity samples of 16 bytes each.
+    """
+
+    def __init__(self, capacity=1440, max_series=1024, sensors=None, use_numpy=None):
+        """
+        :param capacity: Number of samples kept per node and sensor.
+        :param max_series: Maximum number of node and sensor combinations. Readings of new combinations beyond
+            this limit are dropped.
+        :param sensors: Optional collection of field names to keep. By default every numeric reading is kept.
+        :param use_numpy: Force NumPy-backed buffers on or off. By default NumPy is used when installed.
+        """
+        self.capacity = capacity
+        self.max_series = max_series
+        self.sensors = frozenset(sensors) if sensors is not None else None
+        self.use_numpy = numpy is not None if use_numpy is None else use_numpy
+        self.dropped = 0
+        self._buffers = {}
+
+    def __len__(self):
+        return len(self._buffers)
+
+    @property
+    def nbytes(self):
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+    def keys(self):
+        """
+        :return: The (node, sensor) pairs that have history.
+        """
+        return list(self._buffers)
+
+    def record(self, node, node_info, timestamp=None):
+        """
+        Store the numeric readings of one node info dictionary.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        for field, value in node_info.items():
+            if field in SKIPPED_FIELDS or not is_number(value):
+                continue
+            if self.sensors is not None and field not in self.sensors:
+                continue
+            buffer = self._buffers.get((node, field))
+            if buffer is None:
+                if len(self._buffers) >= self.max_series:
+                    self.dropped += 1
+                    continue
+                buffer = self._buffers[(node, field)] = RingBuffer(self.capacity, self.use_numpy)
+            buffer.append(timestamp, value)
+
+    def record_snapshot(self, nodes, timestamp=None):
+        """
+        Store the readings of a whole snapshot keyed by node ID.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        for node, node_info in nodes.items():
+            self.record(node, node_info, timestamp)
+
+    def series(self, node, sensor, since=None, until=None):
+        """
+        :return: A (timestamps, values) tuple in chronological order. Empty when there is no history.
+        """
+        buffer = self._buffers.get((node, sensor))
+        if buffer is None:
+            return (numpy.zeros(0), numpy.zeros(0)) if self.use_numpy else (array('d'), array('d'))
+        return buffer.series(since, until)
+
+    def rollup(self, node, sensor, window, since=None, until=None):
+        """
+        Aggregate a series into fixed windows.
+
+        :param window: Window length in seconds. Windows are aligned to multiples of window.
+        :return: A list of dictionaries with start, min, max, mean and count, one per non-empty window.
+        """
+        times, values = self.series(node, sensor, since, until)
+        if not len(times):
+            return []
+        if self.use_numpy:
+            buckets = numpy.floor_divide(times, window)
+            order = numpy.argsort(buckets, kind="stable")
+            buckets = buckets[order]
+            values = values[order]
+            starts = numpy.concatenate(([0], numpy.flatnonzero(numpy.diff(buckets)) + 1))
+            counts = numpy.diff(numpy.concatenate((starts, [len(values)])))
+            minimums = numpy.minimum.reduceat(values, starts)
+            maximums = numpy.maximum.reduceat(values, starts)
+            means = numpy.add.reduceat(values, starts) / counts
+            return [
+                {"start": float(buckets[start] * window), "min": float(low), "max": float(high),
+                 "mean": float(mean), "count": int(count)}
+                for start, low, high, mean, count in zip(starts, minimums, maximums, means, counts)
+            ]
+
+        windows = {}
+        for timestamp, value in zip(times, values):
+            start = (timestamp // window) * window
+            entry = windows.get(start)
+            if entry is None:
+                windows[start] = [value, value, value, 1]
+            else:
+                entry[0] = min(entry[0], value)
+                entry[1] = max(entry[1], value)
+                entry[2] += value
+                entry[3] += 1
+        return [
+            {"start": start, "min": low, "max": high, "mean": total / count, "count": count}
+            for start, (low, high, total, count) in sorted(windows.items())
+        ]
+
+    def export(self, since=None, until=None):
+        """
+        Export every series at once.
+
+        :return: A dictionary mapping (node, sensor) to a (timestamps, values) tuple.
+        """
+        return {key: buffer.series(since, until) for key, buffer in self._buffers.items()}
@@ -0,0 +1,148 @@
+import re
+from collections import defaultdict
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_name(query_string):
+    """
+    Reduce a query string to a low-cardinality endpoint label, e.g. "info/nodes/5" to "info/nodes/{id}".
+    """
+    path = query_string.split("?", 1)[0]
+    return _ID_SEGMENT.sub("/{id}", "/" + path)[1:]
+
+
+class Instrumentation:
+    """
+    Hooks called by DucoDevice on the request path. Every hook does nothing by default; subclass and override
+    the ones you need.
+    """
+
+    def on_request(self, device, endpoint, duration, size, status):
+        """
+        A request attempt finished, including attempts that failed or got an HTTP error status.
+
+        :param duration: Seconds from sending the request to reading the whole body, or to the failure.
+        :param size: Length of the response body in bytes, 0 for failed attempts.
+        :param status: HTTP status of the response, or None if no response arrived (timeout or connection error).
+        """
+
+    def on_retry(self, device, endpoint, attempt, error):
+        """
+        A failed request is about to be retried.
+        """
+
+    def on_error(self, device, endpoint, error):
+        """
+        A request failed for good, was rejected by the circuit breaker, or returned an undecodable body.
+        """
+
+    def on_cache(self, device, endpoint, hit):
+        """
+        The response cache was consulted.
+        """
+
+    def on_coalesced(self, device, endpoint):
+        """
+        A call was served by an identical request already in flight.
+        """
+
+
+class MetricsCollector(Instrumentation):
+    """
+    Instrumentation that aggregates counters and request duration histograms per host and endpoint.
+    """
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.requests = defaultdict(int)
+        self.response_bytes = defaultdict(int)
+        self.duration_sum = defaultdict(float)
+        self.duration_buckets = defaultdict(lambda: [0] * len(self.buckets))
+        self.retries = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.cache_hits = defaultdict(int)
+        self.cache_misses = defaultdict(int)
+        self.coalesced = defaultdict(int)
+
+    @staticmethod
+    def _key(device, endpoint):
+        return (f"{device.address}:{device.port}", endpoint)
+
+    def on_request(self, device, endpoint, duration, size, status):
+        key = self._key(device, endpoint)
+        self.requests[key] += 1
+        self.response_bytes[key] += size
+        self.duration_sum[key] += duration
+        counts = self.duration_buckets[key]
+        for index, bound in enumerate(self.buckets):
+            if duration <= bound:
+                counts[index] += 1
+
+    def on_retry(self, device, endpoint, attempt, error):
+        self.retries[self._key(device, endpoint)] += 1
+
+    def on_error(self, device, endpoint, error):
+        self.errors[self._key(device, endpoint)] += 1
+
+    def on_cache(self, device, endpoint, hit):
+        if hit:
+            self.cache_hits[self._key(device, endpoint)] += 1
+        else:
+            self.cache_misses[self._key(device, endpoint)] += 1
+
+    def on_coalesced(self, device, endpoint):
+        self.coalesced[self._key(device, endpoint)] += 1
+
+
+def _labels(key, **extra):
+    host, endpoint = key
+    labels = dict(host=host, endpoint=endpoint, **extra)
+    body = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + body + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_bound(bound):
+    return repr(float(bound))
+
+
+def export_prometheus(collector, prefix="pyduco"):
+    """
+    Render the metrics of a MetricsCollector in the Prometheus text exposition format.
+
+    :param collector: The MetricsCollector to export.
+    :param prefix: Prefix of every metric name.
+    :return: The metrics as a string.
+    """
+    lines = []
+
+    def counter(name, help_text, values):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} counter")
+        for key in sorted(values):
+            lines.append(f"{prefix}_{name}{_labels(key)} {values[key]}")
+
+    counter("requests_total", "HTTP request attempts, including failed ones.", collector.requests)
+    counter("response_bytes_total", "Response body bytes received.", collector.response_bytes)
+    counter("retries_total", "Requests retried after a transient failure.", collector.retries)
+    counter("errors_total", "Requests that failed.", collector.errors)
+    counter("cache_hits_total", "Cached responses served.", collector.cache_hits)
+    counter("cache_misses_total", "Cache lookups that needed a request.", collector.cache_misses)
+    counter("coalesced_total", "Calls served by an identical in-flight request.", collector.coalesced)
+
+    name = f"{prefix}_request_duration_seconds"
+    lines.append(f"# HELP {name} Time from sending a request to reading its body or failing.")
+    lines.append(f"# TYPE {name} histogram")
+    for key in sorted(collector.duration_buckets):
+        for bound, count in zip(collector.buckets, collector.duration_buckets[key]):
+            lines.append(f"{name}_bucket{_labels(key, le=_format_bound(bound))} {count}")
+        lines.append(f"{name}_bucket{_labels(key, le='+Inf')} {collector.requests[key]}")
+        lines.append(f"{name}_sum{_labels(key)} {collector.duration_sum[key]}")
+        lines.append(f"{name}_count{_labels(key)} {collector.requests[key]}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,188 @@
+IDENTITY_FIELDS = ("node", "devtype", "subtype", "netw", "prnt", "asso", "location")
+VENTILATION_FIELDS = ("ventilation_state", "ventilation_time_state_remain", "ventilation_time_state_end",
+                      "ventilation_mode", "ventilation_flow_lvl_tgt")
+METADATA_FIELDS = ("addr", "sub", "error", "show", "link", "serialnb", "swversion", "cntdwn", "endtime")
+EMPTY_SENSOR_VALUES = ("-", 0)
+# Fields that never hold a reading: identity, device metadata, the identify flag and the ventilation state timers
+SKIPPED_FIELDS = frozenset(IDENTITY_FIELDS + METADATA_FIELDS +
+                           ("identify", "ventilation_time_state_remain", "ventilation_time_state_end"))
+
+# NodeInfo field -> (API 1.0 key, (section, key) of the API 2.2 payload), in output order. Records of both API
+# versions use these names, so a NodeInfo looks the same whatever firmware the device runs.
+FIELD_PATHS = (
+    ("devtype", "devtype", ("General", "Type")),
+    ("subtype", "subtype", ("General", "SubType")),
+    ("netw", "netw", ("General", "NetworkType")),
+    ("prnt", "prnt", ("General", "Parent")),
+    ("asso", "asso", ("General", "Asso")),
+    ("location", "location", ("General", "Name")),
+    ("identify", "identify", ("General", "Identify")),
+    ("ventilation_state", "state", ("Ventilation", "State")),
+    ("ventilation_time_state_remain", "cntdwn", ("Ventilation", "TimeStateRemain")),
+    ("ventilation_time_state_end", "endtime", ("Ventilation", "TimeStateEnd")),
+    ("ventilation_mode", "mode", ("Ventilation", "Mode")),
+    ("ventilation_flow_lvl_tgt", "trgt", ("Ventilation", "FlowLvlTgt")),
+)
+
+
+def _compile_field_paths(field_paths):
+    sections = {}
+    for field, _, (section, key) in field_paths:
+        sections.setdefault(section, []).append((key, field))
+    return tuple((section, tuple(pairs)) for section, pairs in sections.items())
+
+
+_V1_FIELDS = {v1_key: field for field, v1_key, _ in FIELD_PATHS if v1_key != field}
+_V2_SECTIONS = _compile_field_paths(FIELD_PATHS)
+_IDENTITY = frozenset(IDENTITY_FIELDS)
+_VENTILATION = frozenset(VENTILATION_FIELDS)
+_SLOTS = _IDENTITY | _VENTILATION
+_METADATA = frozenset(METADATA_FIELDS)
+# Ventilation fields reported by sensors(); the state timers are not readings
+_VENTILATION_READINGS = ("ventilation_state", "ventilation_mode", "ventilation_flow_lvl_tgt")
+_NO_READING = EMPTY_SENSOR_VALUES + (None,)
+_EMPTY = {}
+_sensor_fields = {}
+
+
+def is_number(value):
+    """
+    :return: True if value is an int or float reading. Booleans are not readings.
+    """
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def field_name(key):
+    """
+    :return: The node info field of a key, which may be an API 1.0 name such as "state".
+    """
+    return _V1_FIELDS.get(key, key)
+
+
+def parse_node_info_v1(data):
+    """
+    Rename the fields of an API 1.0 node payload to the NodeInfo fields shared with API 2.2. Node info that
+    already uses the shared names is returned unchanged.
+
+    :param data: The node payload as returned by the device.
+    :return: A flat dictionary of node information.
+    """
+    return {_V1_FIELDS.get(key, key): value for key, value in data.items()}
+
+
+def parse_node_info_v2(data):
+    """
+    Flatten an API 2.2 node payload onto the node info fields shared with API 1.0.
+
+    :param data: The node payload as returned by the device.
+    :return: A flat dictionary of node information.
+    """
+    node_info = {"node": data.get("Node")}
+    for section, pairs in _V2_SECTIONS:
+        section_data = data.get(section) or _EMPTY
+        for key, field in pairs:
+            entry = section_data.get(key)
+            node_info[field] = entry.get("Val") if entry else None
+    sensor_data = data.get("Sensor")
+    if sensor_data:
+        for sensor_key, sensor_value in sensor_data.items():
+            if isinstance(sensor_value, dict) and "Val" in sensor_value:
+                field = _sensor_fields.get(sensor_key)
+                if field is None:
+                    field = _sensor_fields[sensor_key] = sensor_key.lower()
+                node_info[field] = sensor_value["Val"]
+    return node_info
+
+class NodeInfo:
+    """
+    Compact typed record of a node, shared by API 1.0 and API 2.2 devices.
+
+    Identity and ventilation fields are attributes. Device metadata such as the serial number lives in
+    metadata, and every other reading lives in values.
+    """
+
+    __slots__ = IDENTITY_FIELDS + VENTILATION_FIELDS + ("values", "metadata")
+
+    def __init__(self, node=None, devtype=None, subtype=None, netw=None, prnt=None, asso=None, location=None,
+                 ventilation_state=None, ventilation_time_state_remain=None, ventilation_time_state_end=None,
+                 ventilation_mode=None, ventilation_flow_lvl_tgt=None, values=None, metadata=None):
+        self.node = node
+        self.devtype = devtype
+        self.subtype = subtype
+        self.netw = netw
+        self.prnt = prnt
+        self.asso = asso
+        self.location = location
+        self.ventilation_state = ventilation_state
+        self.ventilation_time_state_remain = ventilation_time_state_remain
+        self.ventilation_time_state_end = ventilation_time_state_end
+        self.ventilation_mode = ventilation_mode
+        self.ventilation_flow_lvl_tgt = ventilation_flow_lvl_tgt
+        self.values = values if values is not None else {}
+        self.metadata = metadata if metadata is not None else {}
+
+    def __repr__(self):
+        return f"NodeInfo(node={self.node!r}, devtype={self.devtype!r}, netw={self.netw!r}, values={self.values!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, NodeInfo):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    @classmethod
+    def from_dict(cls, node_info):
+        """
+        Build a NodeInfo from a flat node info dictionary as returned by DucoDevice.get_node_info.
+        """
+        record = cls()
+        values = record.values
+        metadata = record.metadata
+        for key, value in node_info.items():
+            if key in _SLOTS:
+                setattr(record, key, value)
+            elif key in _METADATA:
+                metadata[key] = value
+            else:
+                values[key] = value
+        return record
+
+    @classmethod
+    def from_v1(cls, data):
+        """
+        Build a NodeInfo from an API 1.0 nodeinfoget payload.
+        """
+        return cls.from_dict(parse_node_info_v1(data))
+
+    @classmethod
+    def from_v2(cls, data):
+        """
+        Build a NodeInfo from an API 2.2 info/nodes payload.
+        """
+        return cls.from_dict(parse_node_info_v2(data))
+
+    def get(self, key, default=None):
+        """
+        Look up any field by its flat node info name.
+        """
+        if key in _SLOTS:
+            return getattr(self, key)
+        if key in self.values:
+            return self.values[key]
+        return self.metadata.get(key, default)
+
+    def sensors(self):
+        """
+        :return: The names of the ventilation fields and values that hold a reading.
+        """
+        sensors = [field for field in _VENTILATION_READINGS if getattr(self, field) not in _NO_READING]
+        sensors.extend(key for key, value in self.values.items() if value not in EMPTY_SENSOR_VALUES)
+        return sensors
+
+    def as_dict(self):
+        """
+        :return: The flat node info dictionary.
+        """
+        node_info = {field: getattr(self, field) for field in IDENTITY_FIELDS + VENTILATION_FIELDS}
+        node_info.update(self.metadata)
+        node_info.update(self.values)
+        return node_info
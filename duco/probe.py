@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_get_api_version(ip, session=None, timeout=3, debug=False, port=80, protocol="http"):
+    """
+    Determine the API version of a Duco device without blocking the event loop.
+
+    The API 2.x /info probe and the API 1.0 /boxinfoget probe are sent concurrently. A version reported by /info
+    wins; otherwise a /boxinfoget answer holding a JSON object means API 1.0.
+
+    :param ip: The IP address of the device.
+    :param session: Optional aiohttp.ClientSession to reuse.
+    :param timeout: Time in seconds to wait for both probes together.
+    :param debug: If True, log the probe responses at debug level.
+    :param port: The HTTP port of the device.
+    :param protocol: "http" or "https".
+    :return: The API version as a string, or 'unknown'.
+    """
+    owns_session = session is None
+    session = session or aiohttp.ClientSession()
+    base_url = f"{protocol}://{ip}:{port}/"
+
+    async def probe_info():
+        async with session.get(base_url + "info") as response:
+            if response.status != 200:
+                return None
+            data = await response.json(content_type=None)
+            version = data.get('General', {}).get('Board', {}).get('PublicApiVersion', {}).get('Val')
+            if debug:
+                _LOGGER.debug("Version probe of %s: %s -> %s", ip, data, version)
+            return version
+
+    async def probe_boxinfo():
+        async with session.get(base_url + "boxinfoget") as response:
+            if response.status != 200:
+                return None
+            data = await response.json(content_type=None)
+            if debug:
+                _LOGGER.debug("Version probe of %s: %s", ip, data)
+            # Any web server may answer 200 here; only a JSON object is box information
+            return '1.0' if isinstance(data, dict) and data else None
+
+    async def safely(probe):
+        try:
+            return await probe()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, AttributeError) as e:
+            if debug:
+                _LOGGER.debug("Error fetching version info from %s: %s", ip, e)
+            return None
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    info_task = asyncio.ensure_future(safely(probe_info))
+    boxinfo_task = asyncio.ensure_future(safely(probe_boxinfo))
+    try:
+        await asyncio.wait([info_task], timeout=timeout)
+        version = info_task.result() if info_task.done() else None
+        if version is None:
+            await asyncio.wait([boxinfo_task], timeout=max(0, deadline - loop.time()))
+            version = boxinfo_task.result() if boxinfo_task.done() else None
+    finally:
+        for task in (info_task, boxinfo_task):
+            task.cancel()
+        await asyncio.gather(info_task, boxinfo_task, return_exceptions=True)
+        if owns_session:
+            await session.close()
+    return version or 'unknown'
@@ -0,0 +1,269 @@
+import asyncio
+import json
+import logging
+from aiohttp import WSMsgType, web
+from .adapters import V1Adapter
+from .deltas import DeltaTracker
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _node_from_request(request):
+    try:
+        return int(request.match_info.get("node") or request.query.get("node"))
+    except (TypeError, ValueError):
+        return None
+
+
+class DucoProxy:
+    """
+    A local HTTP server that multiplexes one Duco device to many clients.
+
+    The device is polled once per interval and clients are served the cached responses in the device's own
+    format, so a DucoDevice pointed at the proxy works unchanged. Writes are forwarded to the device one at a
+    time in arrival order, including the API 1.0 GET writes that older clients send to any device. Every changed
+    node field is pushed to clients of /events (server-sent events) and /ws (WebSocket).
+    """
+
+    def __init__(self, device, host="127.0.0.1", port=8080, poll_interval=5, max_concurrency=4,
+                 client_queue_size=100):
+        """
+        :param device: The DucoDevice to poll.
+        :param host: Address to listen on.
+        :param port: Port to listen on. 0 picks a free port, stored in port once started.
+        :param poll_interval: Time in seconds between polls of the device.
+        :param max_concurrency: Maximum number of node requests in flight during a poll.
+        :param client_queue_size: Maximum number of pending change events per push client. Events for slower
+            clients are dropped.
+        """
+        self.device = device
+        self.host = host
+        self.port = port
+        self.poll_interval = poll_interval
+        self.max_concurrency = max_concurrency
+        self.client_queue_size = client_queue_size
+        self.deltas = DeltaTracker(emit_initial=False)
+        self._responses = {}
+        self._payloads = {}
+        self._clients = set()
+        self._writes = asyncio.Queue()
+        self._tasks = []
+        self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """
+        Poll the device once, then start serving and polling in the background.
+        """
+        await self.poll_once()
+        app = web.Application()
+        app.router.add_get('/events', self._handle_events)
+        app.router.add_get('/ws', self._handle_websocket)
+        # Older clients send API 1.0 GET writes to every device; they must not reach the read fallback
+        write_routes = list(self.device.adapter.write_routes)
+        write_routes += [route for route in V1Adapter.write_routes if route not in write_routes]
+        for method, route in write_routes:
+            app.router.add_route(method, route, self._handle_write)
+        app.router.add_get('/{path:.*}', self._handle_read)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self._tasks = [asyncio.ensure_future(self._poll_forever()), asyncio.ensure_future(self._write_forever())]
+
+    async def close(self):
+        """
+        Stop polling and serving.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for queue in list(self._clients):
+            while queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _store(self, key, data):
+        self._responses[key] = json.dumps(data).encode("utf-8")
+
+    def _node_key(self, node):
+        return self.device.adapter.node_info_path(node)
+
+    def _store_node(self, node, payload):
+        self._payloads[node] = payload
+        self._store(self._node_key(node), payload)
+        return self.device.adapter.parse_node_info(payload)
+
+    def _store_node_list(self):
+        adapter = self.device.adapter
+        self._store(adapter.node_list_path, adapter.node_list_payload(self._payloads))
+        if adapter.bulk_node_info_path is not None:
+            self._store(adapter.bulk_node_info_path, {"Nodes": list(self._payloads.values())})
+
+    async def _fetch_node_payloads(self):
+        device = self.device
+        bulk_path = device.adapter.bulk_node_info_path
+        if bulk_path is not None and device.supports_endpoint(bulk_path):
+            data = await device.fetch_json(bulk_path, optional=True)
+            if isinstance(data, dict) and isinstance(data.get("Nodes"), list):
+                return {item["Node"]: item for item in data["Nodes"] if isinstance(item, dict) and "Node" in item}
+
+        node_list = await device.get_node_list()
+        if node_list is None:
+            return {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(node):
+            async with semaphore:
+                return await device.fetch_json(self._node_key(node))
+
+        results = await asyncio.gather(*(fetch(node) for node in node_list))
+        return {node: payload for node, payload in zip(node_list, results) if isinstance(payload, dict)}
+
+    async def poll_once(self):
+        """
+        Refresh every cached response from the device and push the changes to clients.
+        """
+        board_key = self.device.adapter.board_info_path
+        board_info = await self.device.fetch_json(board_key)
+        if board_info is not None:
+            self._store(board_key, board_info)
+
+        payloads = await self._fetch_node_payloads()
+        if not payloads:
+            _LOGGER.warning("No node data from host=%s, serving the previous responses", self.device.address)
+            return
+        for node in [node for node in self._payloads if node not in payloads]:
+            del self._payloads[node]
+            self._responses.pop(self._node_key(node), None)
+        nodes = {node: self._store_node(node, payload) for node, payload in payloads.items()}
+        self._store_node_list()
+        self._broadcast(self.deltas.update_snapshot(nodes))
+
+    async def refresh_node(self, node):
+        """
+        Refresh the cached response of a single node and push its changes to clients.
+        """
+        self.device.invalidate_cache(node)
+        payload = await self.device.fetch_json(self._node_key(node))
+        if isinstance(payload, dict):
+            node_info = self._store_node(node, payload)
+            self._store_node_list()
+            self._broadcast(self.deltas.update(node, node_info))
+
+    async def _poll_forever(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.poll_once()
+            except Exception:
+                _LOGGER.exception("Polling host=%s failed", self.device.address)
+
+    async def _write_forever(self):
+        while True:
+            method, query_string, body, node, future = await self._writes.get()
+            try:
+                response = await self.device.fetch_json(query_string, coalesce=False, method=method, body=body)
+                if node is not None:
+                    await self.refresh_node(node)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            if not future.done():
+                future.set_result(response)
+
+    def _broadcast(self, deltas):
+        if not deltas or not self._clients:
+            return
+        for delta in deltas:
+            message = json.dumps(delta._asdict())
+            for queue in self._clients:
+                if queue.full():
+                    continue
+                queue.put_nowait(message)
+
+    def _subscribe(self):
+        queue = asyncio.Queue(maxsize=self.client_queue_size)
+        self._clients.add(queue)
+        return queue
+
+    async def _handle_read(self, request):
+        key = request.match_info["path"]
+        if key == "nodeinfoget":
+            key = f"nodeinfoget?node={request.query.get('node')}"
+        body = self._responses.get(key)
+        if body is None:
+            data = await self.device.fetch_json(request.path_qs.lstrip("/"))
+            if data is None:
+                raise web.HTTPNotFound()
+            body = json.dumps(data).encode("utf-8")
+        return web.Response(body=body, content_type="application/json", charset="UTF-8")
+
+    async def _handle_write(self, request):
+        try:
+            body = await request.json() if request.body_exists else None
+        except ValueError:
+            raise web.HTTPBadRequest()
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((request.method, request.path_qs.lstrip("/"), body, _node_from_request(request),
+                                future))
+        response = await future
+        if response is None:
+            raise web.HTTPBadGateway()
+        if "action_state" in response:
+            return web.Response(text=response["action_state"], content_type="text/plain")
+        return web.json_response(response)
+
+    async def _handle_events(self, request):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        queue = self._subscribe()
+        try:
+            while True:
+                message = await queue.get()
+                if message is None:
+                    break
+                await response.write(f"event: delta\ndata: {message}\n\n".encode("utf-8"))
+        finally:
+            self._clients.discard(queue)
+        return response
+
+    async def _handle_websocket(self, request):
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        queue = self._subscribe()
+
+        async def drain_incoming():
+            async for message in websocket:
+                if message.type == WSMsgType.ERROR:
+                    break
+
+        reader = asyncio.ensure_future(drain_incoming())
+        try:
+            while not reader.done():
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait([getter, reader], return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    break
+                message = getter.result()
+                if message is None:
+                    break
+                await websocket.send_str(message)
+        finally:
+            self._clients.discard(queue)
+            reader.cancel()
+            await websocket.close()
+        return websocket
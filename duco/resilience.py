@@ -0,0 +1,97 @@
+import random
+import time
+from collections import deque
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+
+
+def backoff_delay(attempt, base=0.2, cap=5.0, rng=random.random):
+    """
+    Exponential backoff with full jitter.
+
+    :param attempt: Number of the retry, starting at 0.
+    :return: A random delay in seconds between 0 and min(cap, base * 2 ** attempt).
+    """
+    return rng() * min(cap, base * 2 ** attempt)
+
+
+class RttTracker:
+    """
+    Keep the most recent round-trip times of a host and derive a timeout from them.
+    """
+
+    def __init__(self, window=50, min_samples=10):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def record(self, seconds):
+        self._samples.append(seconds)
+
+    def percentile(self, percent):
+        """
+        :return: The given percentile of the recorded round-trip times, or None without samples.
+        """
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(percent / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def timeout(self, default, percent=95, factor=4.0, minimum=0.5):
+        """
+        Suggest a read timeout of factor times the percentile round-trip time.
+
+        :param default: Timeout used until enough samples are recorded. It is also the upper bound.
+        :param minimum: Lower bound of the suggested timeout.
+        """
+        if len(self._samples) < self.min_samples:
+            return default
+        return max(minimum, min(default, self.percentile(percent) * factor))
+
+
+class CircuitBreaker:
+    """
+    Fail fast while a device is known to be down.
+
+    The circuit opens after failure_threshold consecutive failures. It stays open until record_success is
+    called, typically by a background probe.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, clock=time.monotonic):
+        """
+        :param failure_threshold: Consecutive failures after which the circuit opens.
+        :param reset_timeout: Seconds to wait between probes while the circuit is open.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    @property
+    def is_open(self):
+        return self.state == CIRCUIT_OPEN
+
+    def allow_request(self):
+        return self.state == CIRCUIT_CLOSED
+
+    def record_success(self):
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        """
+        :return: True if this failure opened the circuit.
+        """
+        self.consecutive_failures += 1
+        if self.state == CIRCUIT_CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self.state = CIRCUIT_OPEN
+            self.opened_at = self._clock()
+            return True
+        return False
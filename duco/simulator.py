@@ -0,0 +1,216 @@
+import asyncio
+import json
+import random
+from aiohttp import web
+
+NODE_TEMPLATES = (
+    {"devtype": "UCCO2", "netw": "RF", "sensors": {"co2": 600, "temp": 21.5}},
+    {"devtype": "UCRH", "netw": "RF", "sensors": {"rh": 45, "temp": 21.0}},
+    {"devtype": "VLV", "netw": "WI", "sensors": {}},
+    {"devtype": "UCBAT", "netw": "RF", "sensors": {}},
+)
+
+V2_GENERAL_FIELDS = (
+    ("Type", "devtype"), ("SubType", "subtype"), ("NetworkType", "netw"), ("Parent", "prnt"), ("Asso", "asso"),
+    ("Name", "location"), ("Identify", "identify"),
+)
+V2_VENTILATION_FIELDS = (
+    ("State", "state"), ("TimeStateRemain", "cntdwn"), ("TimeStateEnd", "endtime"), ("Mode", "mode"),
+    ("FlowLvlTgt", "trgt"),
+)
+V2_CONFIG_FIELDS = dict(V2_GENERAL_FIELDS)
+
+
+def _make_nodes(node_count):
+    nodes = {1: {"node": 1, "devtype": "BOX", "subtype": 1, "netw": "VIRT", "addr": 1, "sub": 1, "prnt": 0,
+                 "asso": 0, "location": "DucoBox", "identify": 0, "state": "AUTO", "cntdwn": 0, "endtime": 0,
+                 "mode": "AUTO", "trgt": 20, "serialnb": "RS0000001", "swversion": "16036.13.4.0",
+                 "sensors": {}}}
+    for node in range(2, node_count + 1):
+        template = NODE_TEMPLATES[(node - 2) % len(NODE_TEMPLATES)]
+        nodes[node] = {"node": node, "devtype": template["devtype"], "subtype": 0, "netw": template["netw"],
+                       "addr": node, "sub": 1, "prnt": 1, "asso": 1, "location": f"Room {node}", "identify": 0,
+                       "state": "AUTO", "cntdwn": 0, "endtime": 0, "mode": "-", "trgt": 35,
+                       "serialnb": f"RS{node:07d}", "swversion": "16036.13.4.0",
+                       "sensors": dict(template["sensors"])}
+    return nodes
+
+
+class FakeDucoServer:
+    """
+    A local aiohttp server that behaves like a Duco communication board, for tests and benchmarks.
+
+    API 1.0 serves nodelist, nodeinfoget, board_info, boxinfoget, nodeinfoset and nodesetoperstate.
+    API 2.2 serves info, nodes, info/nodes and info/nodes/{id}, writes through POST action/nodes/{id} and
+    PATCH config/nodes/{id}, and also accepts the API 1.0 write endpoints.
+    """
+
+    def __init__(self, api_version=2.2, node_count=10, latency=0.0, failure_rate=0.0, bulk_endpoint=True,
+                 seed=None, host="127.0.0.1", port=0, path_latency=None):
+        """
+        :param api_version: 1.0 or 2.2.
+        :param node_count: Number of nodes, including the box itself as node 1.
+        :param latency: Seconds every request is delayed before it is answered.
+        :param failure_rate: Fraction of requests answered with HTTP 500.
+        :param bulk_endpoint: If False, API 2.2 info/nodes answers 404 like older firmware.
+        :param seed: Optional seed for the failure randomness.
+        :param path_latency: Optional dictionary of request path, such as "/info/nodes", to the seconds requests
+            for that path are delayed instead of latency.
+        """
+        self.api_version = float(api_version)
+        self.nodes = _make_nodes(node_count)
+        self.latency = latency
+        self.path_latency = dict(path_latency or {})
+        self.failure_rate = failure_rate
+        self.bulk_endpoint = bulk_endpoint
+        self.host = host
+        self.port = port
+        self.request_count = 0
+        self.path_counts = {}
+        self._random = random.Random(seed)
+        self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @property
+    def address(self):
+        return self.host
+
+    async def start(self):
+        """
+        Start serving. When port is 0 a free port is picked and stored in port.
+        """
+        app = web.Application(middlewares=[self._middleware])
+        if self.api_version == 1.0:
+            app.router.add_get('/nodelist', self._v1_nodelist)
+            app.router.add_get('/nodeinfoget', self._v1_nodeinfoget)
+            app.router.add_get('/board_info', self._v1_board_info)
+            app.router.add_get('/boxinfoget', self._v1_board_info)
+        else:
+            app.router.add_get('/info', self._v2_info)
+            app.router.add_get('/nodes', self._v2_nodes)
+            app.router.add_get('/info/nodes', self._v2_info_nodes)
+            app.router.add_get('/info/nodes/{node}', self._v2_info_node)
+            app.router.add_post('/action/nodes/{node}', self._v2_action_node)
+            app.router.add_patch('/config/nodes/{node}', self._v2_config_node)
+        app.router.add_get('/nodeinfoset', self._nodeinfoset)
+        app.router.add_get('/nodesetoperstate', self._nodesetoperstate)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        self.request_count += 1
+        self.path_counts[request.path] = self.path_counts.get(request.path, 0) + 1
+        latency = self.path_latency.get(request.path, self.latency)
+        if latency:
+            await asyncio.sleep(latency)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            return web.Response(status=500, text="Internal Server Error")
+        return await handler(request)
+
+    @staticmethod
+    def _json(data):
+        return web.Response(text=json.dumps(data), content_type="application/json", charset="UTF-8")
+
+    def _node(self, value):
+        try:
+            return self.nodes[int(value)]
+        except (KeyError, TypeError, ValueError):
+            raise web.HTTPNotFound()
+
+    def _v1_node_info(self, node):
+        node_info = {key: value for key, value in node.items() if key not in ("sensors", "identify")}
+        node_info.update(node["sensors"])
+        return node_info
+
+    def _v2_node_info(self, node):
+        data = {
+            "Node": node["node"],
+            "General": {key: {"Val": node[field]} for key, field in V2_GENERAL_FIELDS},
+            "Ventilation": {key: {"Val": node[field]} for key, field in V2_VENTILATION_FIELDS},
+        }
+        if node["sensors"]:
+            data["Sensor"] = {key.capitalize(): {"Val": value} for key, value in node["sensors"].items()}
+        return data
+
+    async def _v1_nodelist(self, request):
+        return self._json({"nodelist": list(self.nodes)})
+
+    async def _v1_nodeinfoget(self, request):
+        return self._json(self._v1_node_info(self._node(request.query.get("node"))))
+
+    async def _v1_board_info(self, request):
+        return self._json({"serial": "FAKE00000001", "uptime": 5433179, "swversion": "16036.13.4.0",
+                           "mac": "01:02:0f:34:a6:0f", "ip": self.host})
+
+    async def _v2_info(self, request):
+        return self._json({"General": {"Board": {"PublicApiVersion": {"Val": "2.2"},
+                                                 "SerialBoardComm": {"Val": "FAKE00000001"}}}})
+
+    async def _v2_nodes(self, request):
+        return self._json([{"Node": node} for node in self.nodes])
+
+    async def _v2_info_nodes(self, request):
+        if not self.bulk_endpoint:
+            raise web.HTTPNotFound()
+        return self._json({"Nodes": [self._v2_node_info(node) for node in self.nodes.values()]})
+
+    async def _v2_info_node(self, request):
+        return self._json(self._v2_node_info(self._node(request.match_info["node"])))
+
+    @staticmethod
+    async def _json_body(request):
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest()
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest()
+        return body
+
+    async def _v2_action_node(self, request):
+        node = self._node(request.match_info["node"])
+        body = await self._json_body(request)
+        if body.get("Action") != "SetVentilationState" or "Val" not in body:
+            raise web.HTTPBadRequest()
+        node["state"] = body["Val"]
+        return self._json({"Result": "SUCCESS"})
+
+    async def _v2_config_node(self, request):
+        node = self._node(request.match_info["node"])
+        body = await self._json_body(request)
+        updates = {}
+        for key, entry in body.items():
+            field = V2_CONFIG_FIELDS.get(key)
+            if field is None or not isinstance(entry, dict) or "Val" not in entry:
+                raise web.HTTPBadRequest()
+            updates[field] = entry["Val"]
+        node.update(updates)
+        return self._json({"Result": "SUCCESS"})
+
+    async def _nodeinfoset(self, request):
+        node = self._node(request.query.get("node"))
+        key = request.query.get("para")
+        if key not in node or key in ("node", "sensors"):
+            return web.Response(text="FAILED", content_type="text/plain")
+        node[key] = request.query.get("value")
+        return web.Response(text="SUCCESS", content_type="text/plain")
+
+    async def _nodesetoperstate(self, request):
+        node = self._node(request.query.get("node"))
+        node["state"] = request.query.get("value")
+        return web.Response(text="SUCCESS", content_type="text/plain")
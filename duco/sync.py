@@ -0,0 +1,110 @@
+import asyncio
+import inspect
+import threading
+from .device import DucoDevice
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_background_loop():
+    """
+    Return the event loop shared by every DucoDeviceSync, starting its daemon thread on first use.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="pyduco-loop", daemon=True)
+            thread.start()
+            _loop = loop
+        return _loop
+
+
+class DucoDeviceSync:
+    """
+    A blocking wrapper around DucoDevice for code that does not use asyncio.
+
+    Every call runs on one background event loop that lives for the whole process, so the device keeps its
+    connection pool, caches and in-flight request sharing between calls. The wrapper is safe to use from many
+    threads at once. Coroutine methods of DucoDevice block until they are done; async iterator methods such as
+    watch_deltas become plain iterators.
+    """
+
+    def __init__(self, address, port=80, protocol="http", api_version=1.0, timeout=None, loop=None, **kwargs):
+        """
+        :param timeout: Optional time in seconds a single call may block. The call is cancelled when it expires.
+        :param loop: Optional event loop running in another thread, used instead of the shared background loop.
+            Calls made from the thread of that loop raise RuntimeError instead of blocking it forever.
+        :param kwargs: Extra keyword arguments passed to DucoDevice.
+        """
+        self.timeout = timeout
+        self.loop = loop or get_background_loop()
+        self.device = self._call(self._create(DucoDevice, address, port=port, protocol=protocol,
+                                              api_version=api_version, **kwargs))
+
+    @classmethod
+    def connect(cls, address, port=80, protocol="http", timeout=None, loop=None, **kwargs):
+        """
+        Create a DucoDeviceSync with its API version detected from the device, like DucoDevice.connect.
+        """
+        self = cls.__new__(cls)
+        self.timeout = timeout
+        self.loop = loop or get_background_loop()
+        self.device = self._call(DucoDevice.connect(address, port=port, protocol=protocol, **kwargs))
+        return self
+
+    @staticmethod
+    async def _create(factory, *args, **kwargs):
+        return factory(*args, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __getattr__(self, name):
+        attribute = getattr(self.device, name)
+        if inspect.iscoroutinefunction(attribute):
+            def call(*args, **kwargs):
+                return self._call(attribute(*args, **kwargs))
+        elif inspect.isasyncgenfunction(attribute):
+            def call(*args, **kwargs):
+                return self._iterate(attribute(*args, **kwargs))
+        else:
+            return attribute
+        call.__name__ = name
+        call.__doc__ = attribute.__doc__
+        return call
+
+    def _call(self, coroutine):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            coroutine.close()
+            raise RuntimeError("DucoDeviceSync cannot block the event loop it runs on; use DucoDevice instead")
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        try:
+            return future.result(self.timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def _iterate(self, iterator):
+        try:
+            while True:
+                try:
+                    yield self._call(iterator.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            asyncio.run_coroutine_threadsafe(iterator.aclose(), self.loop)
+
+    def close(self):
+        """
+        Close the session of the device. The background loop keeps running for other devices.
+        """
+        self._call(self.device.close())
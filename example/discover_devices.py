@@ -1,11 +1,11 @@
-from duco import discover_duco_devices, DucoDevice
+from duco import async_discover_duco_devices, DucoDevice
 
 import asyncio
-from duco import discover_duco_devices, DucoDevice
+from duco import async_discover_duco_devices, DucoDevice
 
 async def main():
     # Discover Duco devices on the network
-    devices = await discover_duco_devices(timeout=5)
+    devices = await async_discover_duco_devices(timeout=5)
 
     # Print the discovered devices
     for device in devices:
@@ -43,5 +43,7 @@ async def main():
         virtual_nodes = await duco_device.get_virtual_nodes()
         print(f"Virtual Nodes: {virtual_nodes}")
 
+        await duco_device.close()
+
 # Run the main function
 asyncio.run(main())
@@ -1,4 +1,7 @@
+import logging
 from duco import get_api_version
 
+logging.basicConfig(level=logging.DEBUG)
+
 version = get_api_version('192.168.13.248', True)
 print(version)
\ No newline at end of file
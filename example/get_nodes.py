@@ -48,5 +48,7 @@ async def main():
         virtual_nodes = await duco_device.get_virtual_nodes()
         print(f"Virtual Nodes: {virtual_nodes}")
 
+        await duco_device.close()
+
 # Run the main function
 asyncio.run(main())
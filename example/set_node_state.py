@@ -1,12 +1,11 @@
-from duco import DucoDevice
+from duco import DucoDeviceSync
 
-duco = DucoDevice(address='192.168.10.216')
-
-# Set the state of a node
-node_id = 1
-state = 'MAN2'
-response = duco.set_node_operational_state(node_id, state)
-if response.get('action_state') == "SUCCESS":
-    print(f"Successfully set the operational state to {state} on node {node_id}")
-else:
-    print(f"Failed to set the operational state to {state} on node {node_id}")
+with DucoDeviceSync(address='192.168.10.216') as duco:
+    # Set the state of a node
+    node_id = 1
+    state = 'MAN2'
+    response = duco.set_node_operational_state(node_id, state)
+    if response is not None and response.get('action_state') == "SUCCESS":
+        print(f"Successfully set the operational state to {state} on node {node_id}")
+    else:
+        print(f"Failed to set the operational state to {state} on node {node_id}")
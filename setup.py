@@ -9,6 +9,15 @@ setup(
         "aiohttp",
         "pytest"
     ],
+    extras_require={
+        "fast": ["orjson"],
+        "benchmark": ["pytest-benchmark"],
+        "numpy": ["numpy"],
+        "arrow": ["pyarrow"],
+    },
+    entry_points={
+        "console_scripts": ["pyduco=duco.cli:main"],
+    },
     author="Stuart Pearson",
     author_email="noreply@hnuk.net",
     description="A library to discover and interact with Duco air systems.",
@@ -0,0 +1,109 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+from duco import ApiAdapter, DucoDevice, register_adapter
+from duco.adapters import V1Adapter, V22Adapter, _ADAPTERS, API_VERSION_MAPPING, get_adapter, normalize_api_version
+from duco.simulator import FakeDucoServer
+
+
+class TestAdapterRegistry(unittest.TestCase):
+    def test_versions_map_to_adapters(self):
+        self.assertIsInstance(get_adapter(1.0), V1Adapter)
+        self.assertIsInstance(get_adapter("2.2"), V22Adapter)
+        self.assertIsInstance(get_adapter("2.3"), V22Adapter)
+        self.assertIsNone(normalize_api_version("unknown"))
+        with self.assertRaises(NotImplementedError):
+            get_adapter(3.0)
+        with self.assertRaises(NotImplementedError):
+            DucoDevice("192.168.1.100", api_version=3.0)
+
+    def test_registered_adapter_serves_its_major_version(self):
+        class V3Adapter(V22Adapter):
+            version = 3.0
+            node_info_template = "v3/nodes/{node}"
+
+        register_adapter(V3Adapter())
+        try:
+            device = DucoDevice("192.168.1.100", api_version="3.1")
+            self.assertEqual(device.api_version, 3.0)
+            self.assertEqual(device.adapter.node_info_path(5), "v3/nodes/5")
+        finally:
+            del _ADAPTERS[3.0]
+            del API_VERSION_MAPPING[3]
+
+    def test_setting_api_version_switches_adapter(self):
+        device = DucoDevice("192.168.1.100")
+        self.assertEqual(device.adapter.node_list_path, "nodelist")
+        device.api_version = 2.2
+        self.assertEqual(device.adapter.node_list_path, "nodes")
+
+    def test_v1_payloads(self):
+        adapter = get_adapter(1.0)
+        self.assertEqual(adapter.node_info_path(3), "nodeinfoget?node=3")
+        self.assertIs(adapter.node_info_path(3), adapter.node_info_path(3))
+        self.assertEqual(adapter.parse_node_list({"nodelist": [1, 2]}), [1, 2])
+        self.assertEqual(adapter.parse_board_serial({"serial": "RS1"}), "RS1")
+        self.assertEqual(adapter.operational_state_request(2, "MAN1"), ("GET", "nodesetoperstate?node=2&value=MAN1",
+                                                                        None))
+
+    def test_v22_payloads(self):
+        adapter = get_adapter(2.2)
+        self.assertEqual(adapter.parse_node_list([{"Node": 1}, {"Node": 2}]), [1, 2])
+        self.assertEqual(adapter.parse_bulk_node_info({"Nodes": [{"Node": 1, "General": {"Type": {"Val": "BOX"}}}]})
+                         [0][1]["devtype"], "BOX")
+        self.assertIsNone(adapter.parse_bulk_node_info(None))
+        self.assertEqual(adapter.parameter_request(2, "location", "Hall"),
+                         ("PATCH", "config/nodes/2", {"Name": {"Val": "Hall"}}))
+        self.assertEqual(adapter.parse_write_response({"Result": "SUCCESS"}), {"action_state": "SUCCESS"})
+        self.assertEqual(adapter.parse_write_response({"Result": "FAILED"}), {"action_state": "FAILED"})
+        self.assertEqual(adapter.parse_write_response({}), {"action_state": "SUCCESS"})
+        self.assertIsNone(adapter.parse_write_response(None))
+        self.assertTrue(issubclass(V22Adapter, ApiAdapter))
+
+
+class TestV22Writes(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = FakeDucoServer(api_version=2.2, node_count=3)
+        await self.server.start()
+        self.device = DucoDevice(self.server.address, port=self.server.port, api_version=2.2)
+
+    async def asyncTearDown(self):
+        await self.device.close()
+        await self.server.close()
+
+    async def test_writes_use_the_v22_endpoints(self):
+        self.assertEqual(await self.device.set_node_operational_state(2, "MAN3"), {"action_state": "SUCCESS"})
+        self.assertEqual(await self.device.set_node_location(3, "Attic"), {"action_state": "SUCCESS"})
+        self.assertEqual(self.server.path_counts, {"/action/nodes/2": 1, "/config/nodes/3": 1})
+        self.assertEqual((await self.device.get_node_info(2))["ventilation_state"], "MAN3")
+        self.assertEqual((await self.device.get_node_info(3))["location"], "Attic")
+
+    async def test_rejected_write_fails(self):
+        self.assertIsNone(await self.device.set_node_parameters(2, "bogus", 1))
+
+    async def test_failed_result_is_not_a_success(self):
+        fetch = AsyncMock(return_value={"Result": "FAILED"})
+        with patch.object(self.device, 'fetch_json', fetch):
+            results = await self.device.set_nodes_batch([(2, "MAN2")])
+        self.assertEqual(results[0].response, {"action_state": "FAILED"})
+        self.assertFalse(results[0].success)
+        self.assertEqual(fetch.await_count, 1)
+
+    async def test_rejected_write_is_not_retried(self):
+        results = await self.device.set_nodes_batch([(2, "bogus", 1)], retries=2, retry_delay=0)
+        self.assertFalse(results[0].success)
+        self.assertEqual(results[0].attempts, 1)
+        self.assertEqual(self.server.path_counts["/config/nodes/2"], 1)
+
+    async def test_server_error_is_retried(self):
+        self.server.failure_rate = 1.0
+        results = await self.device.set_nodes_batch([(2, "location", "Hall")], retries=2, retry_delay=0)
+        self.assertFalse(results[0].success)
+        self.assertEqual(results[0].attempts, 3)
+
+    async def test_batch_verifies_against_the_ventilation_state(self):
+        results = await self.device.set_nodes_batch([(2, "MAN2"), (3, "location", "Hall")], verify=True)
+        self.assertEqual([result.verified for result in results], [True, True])
+
+
+if __name__ == '__main__':
+    unittest.main()
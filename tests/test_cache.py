@@ -0,0 +1,40 @@
+import unittest
+from duco.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache(maxsize=2, clock=self.clock)
+
+    def test_entry_expires_after_ttl(self):
+        self.cache.set("a", 1, ttl=5)
+        self.clock.now = 4.9
+        self.assertEqual(self.cache.get("a"), 1)
+        self.clock.now = 5.0
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.set("a", 1, ttl=5)
+        self.cache.set("b", 2, ttl=5)
+        self.cache.get("a")
+        self.cache.set("c", 3, ttl=5)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertIsNone(self.cache.get("b"))
+
+    def test_invalidate_with_predicate(self):
+        self.cache.set(("node_info", 1), {}, ttl=5)
+        self.cache.set(("node_info", 2), {}, ttl=5)
+        self.cache.invalidate(lambda key: key[1] == 1)
+        self.assertEqual(len(self.cache), 1)
+
+if __name__ == '__main__':
+    unittest.main()
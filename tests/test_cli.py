@@ -0,0 +1,72 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from duco.cli import NdjsonWriter, build_parser, parse_operation, parse_target, read_targets
+from duco.simulator import FakeDucoServer
+
+
+class TestParsing(unittest.TestCase):
+    def test_parse_target(self):
+        self.assertEqual(parse_target("192.168.1.10"), ("192.168.1.10", 80))
+        self.assertEqual(parse_target("192.168.1.10:8080"), ("192.168.1.10", 8080))
+        self.assertEqual(parse_target("[fe80::1]:8080"), ("fe80::1", 8080))
+        self.assertEqual(parse_target("fe80::1", 81), ("fe80::1", 81))
+
+    def test_read_targets_merges_hosts_and_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "hosts.txt")
+            with open(path, "w") as address_file:
+                address_file.write("# living room\n192.168.1.11\n\n192.168.1.10  # again\n192.168.1.12:81\n")
+            targets = read_targets(["192.168.1.10"], [path])
+        self.assertEqual(targets, [("192.168.1.10", 80), ("192.168.1.11", 80), ("192.168.1.12", 81)])
+
+    def test_parse_operation(self):
+        self.assertEqual(parse_operation("2:MAN2"), (2, "MAN2"))
+        self.assertEqual(parse_operation("3:location=Kitchen"), (3, "location", "Kitchen"))
+        with self.assertRaises(Exception):
+            parse_operation("MAN2")
+
+
+class TestCommands(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = FakeDucoServer(api_version=1.0, node_count=5)
+        await self.server.start()
+        self.target = f"{self.server.address}:{self.server.port}"
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def run_command(self, *argv):
+        args = build_parser().parse_args(argv)
+        args.targets = read_targets(args.hosts, args.files, args.port)
+        stream = io.StringIO()
+        writer = NdjsonWriter(stream)
+        await args.handler(args, writer)
+        return [json.loads(line) for line in stream.getvalue().splitlines()], writer.errors
+
+    async def test_snapshot_streams_one_line_per_node(self):
+        lines, errors = await self.run_command("snapshot", self.target, "127.0.0.1:1", "--probe-timeout", "0.5")
+        nodes = sorted(line["node"] for line in lines if "info" in line)
+        self.assertEqual(nodes, [1, 2, 3, 4, 5])
+        self.assertEqual(errors, 1)
+        self.assertEqual([line["host"] for line in lines if "error" in line], ["127.0.0.1:1"])
+
+    async def test_snapshot_reports_an_unreachable_device(self):
+        lines, errors = await self.run_command("snapshot", "127.0.0.1:1", "--api-version", "2.2")
+        self.assertEqual(errors, 1)
+        self.assertEqual([line["host"] for line in lines], ["127.0.0.1:1"])
+        self.assertIn("node list", lines[0]["error"])
+
+    async def test_set_writes_to_every_node(self):
+        lines, errors = await self.run_command("set", self.target, "--api-version", "1.0", "-o", "2:MAN2",
+                                               "-o", "3:location=Kitchen")
+        self.assertEqual(errors, 0)
+        self.assertTrue(all(line["success"] for line in lines))
+        self.assertEqual(self.server.nodes[2]["state"], "MAN2")
+        self.assertEqual(self.server.nodes[3]["location"], "Kitchen")
+
+
+if __name__ == '__main__':
+    unittest.main()
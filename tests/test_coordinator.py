@@ -0,0 +1,63 @@
+import asyncio
+import unittest
+from unittest.mock import Mock, AsyncMock
+from duco.coordinator import DucoCoordinator
+
+
+class TestDucoCoordinator(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.device = Mock()
+        self.device.get_node_info = AsyncMock(return_value={"node": 2, "co2": 640, "temp": 21.5})
+
+    async def test_overlapping_subscriptions_share_one_fetch(self):
+        received = []
+        async with DucoCoordinator(self.device, jitter=0) as coordinator:
+            coordinator.subscribe(2, "co2", 10, callback=received.append)
+            coordinator.subscribe(2, "temp", 10, callback=received.append)
+            await asyncio.sleep(0.05)
+        self.assertEqual(self.device.get_node_info.await_count, 1)
+        self.assertEqual(sorted((update.attribute, update.value) for update in received), [("co2", 640), ("temp", 21.5)])
+
+    async def test_updates_without_callback_go_to_queue(self):
+        async with DucoCoordinator(self.device, jitter=0) as coordinator:
+            coordinator.subscribe(2, "co2", 10)
+            update = await asyncio.wait_for(coordinator.queue.get(), 1)
+        self.assertEqual((update.node, update.attribute, update.value), (2, "co2", 640))
+
+    async def test_unreachable_node_backs_off(self):
+        self.device.get_node_info.return_value = None
+        async with DucoCoordinator(self.device, jitter=0) as coordinator:
+            coordinator.subscribe(1, "ventilation_state", 0.05)
+            await asyncio.sleep(0.35)
+        # Without backoff this would be about seven polls
+        self.assertLessEqual(self.device.get_node_info.await_count, 3)
+
+    async def test_slow_node_does_not_hold_up_other_nodes(self):
+        async def get_node_info(node):
+            await asyncio.sleep(1 if node == 1 else 0)
+            return {"node": node, "co2": 600 + node}
+
+        self.device.get_node_info = AsyncMock(side_effect=get_node_info)
+        received = []
+        async with DucoCoordinator(self.device, jitter=0) as coordinator:
+            coordinator.subscribe(1, "co2", 0.05, callback=received.append)
+            coordinator.subscribe(2, "co2", 0.05, callback=received.append)
+            await asyncio.sleep(0.3)
+        self.assertGreaterEqual([update.node for update in received].count(2), 3)
+        self.assertNotIn(1, [update.node for update in received])
+
+    async def test_failing_callback_is_logged_and_polling_continues(self):
+        def fail(update):
+            raise RuntimeError("broken subscriber")
+
+        received = []
+        async with DucoCoordinator(self.device, jitter=0) as coordinator:
+            with self.assertLogs("duco.coordinator", level="ERROR"):
+                coordinator.subscribe(2, "co2", 0.05, callback=fail)
+                coordinator.subscribe(2, "temp", 0.05, callback=received.append)
+                await asyncio.sleep(0.2)
+            self.assertFalse(coordinator._task.done())
+        self.assertGreaterEqual(len(received), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from unittest.mock import patch, AsyncMock
+from duco import DeltaTracker, DucoDevice, NodeDelta
+
+
+class TestDeltaTracker(unittest.TestCase):
+    def test_first_snapshot_reports_every_field(self):
+        tracker = DeltaTracker()
+        deltas = tracker.update(2, {"co2": 600, "state": "AUTO"}, timestamp=1)
+        self.assertEqual(deltas, [NodeDelta(2, "co2", None, 600, 1), NodeDelta(2, "state", None, "AUTO", 1)])
+
+    def test_only_changed_fields_are_reported(self):
+        tracker = DeltaTracker(emit_initial=False)
+        tracker.update(2, {"co2": 600, "state": "AUTO"})
+        deltas = tracker.update(2, {"co2": 600, "state": "MAN2"}, timestamp=2)
+        self.assertEqual(deltas, [NodeDelta(2, "state", "AUTO", "MAN2", 2)])
+
+    def test_deadband_suppresses_small_changes_but_not_drift(self):
+        tracker = DeltaTracker(deadbands={"co2": 25}, emit_initial=False)
+        tracker.update(2, {"co2": 600})
+        self.assertEqual(tracker.update(2, {"co2": 610}), [])
+        self.assertEqual(tracker.update(2, {"co2": 620}), [])
+        deltas = tracker.update(2, {"co2": 630}, timestamp=3)
+        self.assertEqual(deltas, [NodeDelta(2, "co2", 600, 630, 3)])
+
+    def test_removed_field_is_reported(self):
+        tracker = DeltaTracker(emit_initial=False)
+        tracker.update(2, {"co2": 600, "temp": 21})
+        self.assertEqual(tracker.update(2, {"co2": 600}, timestamp=4), [NodeDelta(2, "temp", 21, None, 4)])
+
+
+class TestWatchDeltas(unittest.IsolatedAsyncioTestCase):
+    async def test_watch_deltas_yields_changes(self):
+        device = DucoDevice(address="192.168.1.100", port=80)
+        snapshots = AsyncMock(side_effect=[
+            ({1: {"state": "AUTO"}}, {}),
+            ({1: {"state": "AUTO"}}, {}),
+            ({1: {"state": "MAN2"}}, {}),
+        ])
+        with patch.object(device, 'get_all_node_info', snapshots):
+            stream = device.watch_deltas(interval=0)
+            initial = await stream.__anext__()
+            change = await stream.__anext__()
+            await stream.aclose()
+        self.assertEqual((initial.old, initial.new), (None, "AUTO"))
+        self.assertEqual((change.old, change.new), ("AUTO", "MAN2"))
+        self.assertEqual(snapshots.await_count, 3)
+
+    async def test_concurrent_watchers_keep_their_own_state(self):
+        device = DucoDevice(address="192.168.1.100", port=80)
+        snapshots = [{1: {"co2": 600}}, {1: {"co2": 620}}, {1: {"co2": 640}}, {1: {"co2": 660}}]
+        fetch = AsyncMock(side_effect=[(nodes, {}) for nodes in snapshots])
+        with patch.object(device, 'get_all_node_info', fetch):
+            coarse = device.watch_deltas(interval=0, deadbands={"co2": 50})
+            fine = device.watch_deltas(interval=0)
+            first = await coarse.__anext__()
+            initial = await fine.__anext__()
+            change = await coarse.__anext__()
+            await coarse.aclose()
+            await fine.aclose()
+        self.assertEqual((first.old, first.new), (None, 600))
+        self.assertEqual((initial.old, initial.new), (None, 620))
+        self.assertEqual((change.old, change.new), (600, 660))
+
+if __name__ == '__main__':
+    unittest.main()
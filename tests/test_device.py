@@ -1,94 +1,80 @@
+import asyncio
+import json
 import unittest
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, AsyncMock
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 from duco import DucoDevice  # Adjust the import according to your module name
+from duco.simulator import FakeDucoServer
 
-class TestDucoDevice(unittest.TestCase):
-    def setUp(self):
-        # Set up a DucoDevice instance with test parameters
-        self.device = DucoDevice(address="192.168.1.100", port=80)
+class TestDucoDevice(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Every test registers the responses of its endpoints in self.responses before making requests
+        self.responses = {}
+
+        async def handler(request):
+            text, content_type = self.responses[request.match_info["path"]]
+            return web.Response(text=text, content_type=content_type)
+
+        app = web.Application()
+        app.router.add_get('/{path:.*}', handler)
+        self.server = TestServer(app, host="127.0.0.1")
+        await self.server.start_server()
+        self.device = DucoDevice(address="127.0.0.1", port=self.server.port)
+
+    async def asyncTearDown(self):
+        await self.device.close()
+        await self.server.close()
+
+    def respond(self, path, data, content_type="application/json"):
+        self.responses[path] = (data if isinstance(data, str) else json.dumps(data), content_type)
+
+    async def test_fetch_json_success(self):
+        self.respond("some_query", '{"action_state": "SUCCESS"}')
 
-    @patch('requests.get')
-    def test_fetch_json_success(self, mock_get):
-        # Mock response object
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = '{"action_state": "SUCCESS"}'
-        mock_response.headers = {'content-type': 'application/json'}
-        mock_response.json.return_value = {"action_state": "SUCCESS"}
-        mock_get.return_value = mock_response
-        
         # Call fetch_json and check the result
-        result = self.device.fetch_json("some_query")
+        result = await self.device.fetch_json("some_query")
         self.assertEqual(result, {"action_state": "SUCCESS"})
 
-    @patch('requests.get')
-    def test_fetch_json_failed_response(self, mock_get):
-        # Mock response object
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = 'FAILED'
-        mock_response.headers = {'content-type': 'text/plain'}
-        mock_get.return_value = mock_response
-        
+    async def test_fetch_json_failed_response(self):
+        self.respond("some_query", "FAILED", content_type="text/plain")
+
         # Call fetch_json and check the result
-        result = self.device.fetch_json("some_query")
+        result = await self.device.fetch_json("some_query")
         self.assertEqual(result, {"action_state": "FAILED"})
-    
-    @patch('requests.get')
-    def test_fetch_json_non_json(self, mock_get):
-        # Mock a non-JSON response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = 'Non-JSON response'
-        mock_response.headers = {'content-type': 'text/html'}
-        mock_get.return_value = mock_response
-        
+
+    async def test_fetch_json_non_json(self):
+        # Serve a non-JSON response
+        self.respond("some_query", "Non-JSON response", content_type="text/html")
+
         # Call fetch_json and check for None (unexpected content type)
-        result = self.device.fetch_json("some_query")
+        result = await self.device.fetch_json("some_query")
         self.assertIsNone(result)
 
-    @patch('requests.get')
-    def test_get_cap_board_info(self, mock_get):
-        # Mock response for board info
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+    async def test_get_cap_board_info(self):
+        board_info = {
             "serial": "ASDF22403066",
             "uptime": 5433179,
             "swversion": "16036.13.4.0",
             "mac": "01:02:0f:34:a6:0f",
             "ip": "192.168.11.6"
         }
-        mock_get.return_value = mock_response
-        
+        self.respond("board_info", board_info)
+
         # Call get_cap_board_info and check the result
-        result = self.device.get_cap_board_info()
-        self.assertEqual(result, {
-            "serial": "ASDF22403066",
-            "uptime": 5433179,
-            "swversion": "16036.13.4.0",
-            "mac": "01:02:0f:34:a6:0f",
-            "ip": "192.168.11.6"
-        })
-    
-    @patch('requests.get')
-    def test_get_node_list(self, mock_get):
-        # Mock response for node list
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"nodelist": [1, 2, 3]}
-        mock_get.return_value = mock_response
-        
+        result = await self.device.get_cap_board_info()
+        self.assertEqual(result, board_info)
+
+    async def test_get_node_list(self):
+        self.respond("nodelist", {"nodelist": [1, 2, 3]})
+
         # Call get_node_list and check the result
-        result = self.device.get_node_list()
+        result = await self.device.get_node_list()
         self.assertEqual(result, [1, 2, 3])
-    
-    @patch('requests.get')
-    def test_get_node_info(self, mock_get):
-        # Mock response for node info
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+
+    async def test_get_node_info(self):
+        node_info = {
             "node": 1,
             "devtype": "BOX",
             "subtype": 0,
@@ -98,32 +84,263 @@ class TestDucoDevice(unittest.TestCase):
             "location": "Washing Machine",
             "state": "AUTO"
         }
-        mock_get.return_value = mock_response
-        
+        self.respond("nodeinfoget", node_info)
+
         # Call get_node_info and check the result
-        result = self.device.get_node_info(1)
-        self.assertEqual(result, {
-            "node": 1,
-            "devtype": "BOX",
-            "subtype": 0,
-            "netw": "VIRT",
-            "addr": 1,
-            "sub": 1,
-            "location": "Washing Machine",
-            "state": "AUTO"
-        })
-    
-    @patch('requests.get')
-    def test_set_node_operational_state(self, mock_get):
-        # Mock response for setting operational state
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"action_state": "SUCCESS"}
-        mock_get.return_value = mock_response
-        
+        result = await self.device.get_node_info(1)
+        self.assertEqual(result, node_info)
+
+    async def test_set_node_operational_state(self):
+        self.respond("nodesetoperstate", "SUCCESS", content_type="text/plain")
+
         # Call set_node_operational_state and check the result
-        result = self.device.set_node_operational_state(1, "OFF")
+        result = await self.device.set_node_operational_state(1, "OFF")
         self.assertEqual(result, {"action_state": "SUCCESS"})
 
+class TestDucoDeviceSession(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Serve a minimal API 1.0 node list from a local test server
+        async def nodelist(request):
+            return web.Response(text=json.dumps({"nodelist": [1, 2, 3]}), content_type="application/json", charset="UTF-8")
+
+        async def nodesetoperstate(request):
+            return web.Response(text="SUCCESS\r\n", content_type="text/plain")
+
+        async def board_info(request):
+            return web.Response(text=json.dumps({"serial": "ASDF22403066"}), content_type="text/html")
+
+        async def broken(request):
+            return web.Response(text="<html>Not JSON</html>", content_type="text/html")
+
+        app = web.Application()
+        app.router.add_get('/nodelist', nodelist)
+        app.router.add_get('/nodesetoperstate', nodesetoperstate)
+        app.router.add_get('/board_info', board_info)
+        app.router.add_get('/broken', broken)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_session_is_reused_between_requests(self):
+        async with DucoDevice(address=self.server.host, port=self.server.port) as device:
+            session = await device.get_session()
+            self.assertEqual(await device.get_node_list(), [1, 2, 3])
+            self.assertEqual(await device.get_node_list(), [1, 2, 3])
+            self.assertIs(await device.get_session(), session)
+        self.assertTrue(session.closed)
+
+    async def test_response_decoding(self):
+        async with DucoDevice(address=self.server.host, port=self.server.port) as device:
+            self.assertEqual(await device.set_node_operational_state(1, "MAN2"), {"action_state": "SUCCESS"})
+            self.assertEqual(await device.get_cap_board_info(), {"serial": "ASDF22403066"})
+            self.assertIsNone(await device.fetch_json("broken"))
+
+    async def test_injected_session_is_not_closed(self):
+        async with aiohttp.ClientSession() as session:
+            async with DucoDevice(address=self.server.host, port=self.server.port, session=session) as device:
+                self.assertEqual(await device.get_node_list(), [1, 2, 3])
+            self.assertFalse(session.closed)
+
+    async def test_injected_connector_is_shared(self):
+        connector = aiohttp.TCPConnector()
+        first = DucoDevice(address=self.server.host, port=self.server.port, connector=connector)
+        second = DucoDevice(address=self.server.host, port=self.server.port, connector=connector)
+        self.assertEqual(await first.get_node_list(), [1, 2, 3])
+        self.assertEqual(await second.get_node_list(), [1, 2, 3])
+        await first.close()
+        await second.close()
+        self.assertFalse(connector.closed)
+        await connector.close()
+
+class TestDucoDeviceSnapshot(unittest.IsolatedAsyncioTestCase):
+    async def test_get_all_node_info_v1(self):
+        device = DucoDevice(address="192.168.1.100", port=80)
+
+        async def fake_fetch(query_string):
+            if query_string == "nodelist":
+                return {"nodelist": [1, 2, 3]}
+            if query_string == "nodeinfoget?node=3":
+                return None
+            node = int(query_string.split("=")[1])
+            return {"node": node, "netw": "RF"}
+
+        with patch.object(device, 'fetch_json', AsyncMock(side_effect=fake_fetch)):
+            nodes, errors = await device.get_all_node_info(max_concurrency=2)
+        self.assertEqual(nodes, {1: {"node": 1, "netw": "RF"}, 2: {"node": 2, "netw": "RF"}})
+        self.assertEqual(list(errors), [3])
+
+    async def test_get_all_node_info_v2_bulk(self):
+        device = DucoDevice(address="192.168.1.100", port=80, api_version=2.2)
+        bulk = {"Nodes": [
+            {"Node": 1, "General": {"Type": {"Val": "BOX"}, "NetworkType": {"Val": "VIRT"}}},
+            {"Node": 2, "General": {"Type": {"Val": "UCCO2"}}, "Sensor": {"Co2": {"Val": 612}}},
+        ]}
+        fetch = AsyncMock(return_value=bulk)
+        with patch.object(device, 'fetch_json', fetch):
+            nodes, errors = await device.get_all_node_info()
+        fetch.assert_awaited_once_with("info/nodes", optional=True)
+        self.assertEqual(errors, {})
+        self.assertEqual(nodes[1]["devtype"], "BOX")
+        self.assertEqual(nodes[2]["co2"], 612)
+
+class TestDucoDeviceCache(unittest.IsolatedAsyncioTestCase):
+    async def test_sensor_sweep_uses_one_request_per_node(self):
+        device = DucoDevice(address="192.168.1.100", port=80)
+        fetch = AsyncMock(return_value={"node": 2, "devtype": "UCCO2", "netw": "RF", "co2": 650, "temp": 21})
+        with patch.object(device, 'fetch_json', fetch):
+            sensors = await device.get_valid_node_sensors(2)
+            for sensor in sensors:
+                await device.get_node_key_value(2, sensor)
+        self.assertEqual(sensors, ["co2", "temp"])
+        self.assertEqual(fetch.await_count, 1)
+
+    async def test_set_node_invalidates_node_entry(self):
+        device = DucoDevice(address="192.168.1.100", port=80)
+        fetch = AsyncMock(return_value={"node": 1, "state": "AUTO"})
+        with patch.object(device, 'fetch_json', fetch):
+            await device.get_node_info(1)
+            fetch.return_value = {"action_state": "SUCCESS"}
+            await device.set_node_operational_state(1, "MAN2")
+            fetch.return_value = {"node": 1, "state": "MAN2"}
+            self.assertEqual((await device.get_node_info(1))["state"], "MAN2")
+        self.assertEqual(fetch.await_count, 3)
+
+    async def test_cached_results_are_copies(self):
+        device = DucoDevice(address="192.168.1.100", port=80)
+        fetch = AsyncMock(side_effect=lambda query_string: (
+            [2, 3] if query_string == "nodelist" else {"node": int(query_string[-1]), "netw": "RF", "co2": 600}))
+        with patch.object(device, 'fetch_json', fetch):
+            (await device.get_node_types("RF")).append(999)
+            (await device.get_node_info(2))["co2"] = 0
+            self.assertEqual(await device.get_wireless_nodes(), [2, 3])
+            self.assertEqual((await device.get_node_info(2))["co2"], 600)
+            (await device.get_node_list()).clear()
+            self.assertEqual(await device.get_node_list(), [2, 3])
+
+    async def test_zero_ttl_disables_cache(self):
+        device = DucoDevice(address="192.168.1.100", port=80, cache_ttl={"node_info": 0})
+        fetch = AsyncMock(return_value={"node": 1})
+        with patch.object(device, 'fetch_json', fetch):
+            await device.get_node_info(1)
+            await device.get_node_info(1)
+        self.assertEqual(fetch.await_count, 2)
+
+class TestDucoDeviceNodeIndex(unittest.IsolatedAsyncioTestCase):
+    async def test_node_classes_share_one_sweep(self):
+        device = DucoDevice(address="192.168.1.100", port=80)
+        node_infos = {
+            1: {"node": 1, "devtype": "BOX", "netw": "VIRT"},
+            2: {"node": 2, "devtype": "UCCO2", "netw": "RF"},
+            3: {"node": 3, "devtype": "UCRH", "netw": "RF"},
+            4: {"node": 4, "devtype": "VLV", "netw": "WI"},
+        }
+
+        async def fake_fetch(query_string):
+            if query_string == "nodelist":
+                return {"nodelist": list(node_infos)}
+            return node_infos[int(query_string.split("=")[1])]
+
+        fetch = AsyncMock(side_effect=fake_fetch)
+        with patch.object(device, 'fetch_json', fetch):
+            self.assertEqual(await device.get_wireless_nodes(), [2, 3])
+            self.assertEqual(await device.get_wired_nodes(), [4])
+            self.assertEqual(await device.get_virtual_nodes(), [1])
+            node_index = await device.get_node_index()
+        self.assertEqual(node_index["devtype"]["UCCO2"], [2])
+        self.assertEqual(fetch.await_count, len(node_infos) + 1)
+
+class TestDucoDeviceCoalescing(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.device = DucoDevice(address="192.168.1.100", port=80)
+
+        async def slow_request(query_string, retries=0, method="GET", body=None, optional=False, failures=None):
+            await asyncio.sleep(0.05)
+            return {"query": query_string}
+
+        self.request = AsyncMock(side_effect=slow_request)
+
+    async def test_identical_reads_share_one_request(self):
+        with patch.object(self.device, '_request_json', self.request):
+            results = await asyncio.gather(*(self.device.fetch_json("nodeinfoget?node=5") for _ in range(5)))
+        self.assertEqual(self.request.await_count, 1)
+        self.assertTrue(all(result == {"query": "nodeinfoget?node=5"} for result in results))
+        self.assertEqual(self.device.request_stats, {"requests": 1, "coalesced": 4})
+
+    async def test_writes_are_never_coalesced(self):
+        with patch.object(self.device, '_request_json', self.request):
+            await asyncio.gather(*(self.device.set_node_parameters(1, "location", "Hall") for _ in range(3)))
+        self.assertEqual(self.request.await_count, 3)
+        self.assertEqual(self.device.request_stats["coalesced"], 0)
+
+class TestDucoDeviceBatchWrites(unittest.IsolatedAsyncioTestCase):
+    async def test_batch_retries_and_verifies(self):
+        device = DucoDevice(address="192.168.1.100", port=80)
+        states = {1: "AUTO", 2: "AUTO", 3: "AUTO"}
+        dropped = []
+
+        async def fake_fetch(query_string, coalesce=True, method="GET", body=None, failures=None):
+            if query_string == "nodelist":
+                return {"nodelist": list(states)}
+            if query_string.startswith("nodeinfoget"):
+                node = int(query_string.split("=")[1])
+                return {"node": node, "state": states[node]}
+            node = int(query_string.split("node=")[1].split("&")[0])
+            if node == 2 and not dropped:
+                # Lose the first write to node 2
+                dropped.append(query_string)
+                return None
+            if node == 3:
+                return {"action_state": "FAILED"}
+            states[node] = query_string.split("value=")[1]
+            return {"action_state": "SUCCESS"}
+
+        operations = [(1, "MAN2"), (2, "MAN2"), (3, "MAN2")]
+        with patch.object(device, 'fetch_json', AsyncMock(side_effect=fake_fetch)):
+            results = await device.set_nodes_batch(operations, retry_delay=0, verify=True)
+
+        self.assertEqual([result.operation for result in results], operations)
+        self.assertEqual([result.success for result in results], [True, True, False])
+        self.assertEqual([result.attempts for result in results], [1, 2, 1])
+        self.assertEqual([result.verified for result in results], [True, True, None])
+
+class TestDucoDeviceConnect(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        DucoDevice._api_versions.clear()
+
+    async def test_connect_detects_api_version(self):
+        for api_version in (1.0, 2.2):
+            async with FakeDucoServer(api_version=api_version, node_count=3) as server:
+                device = await DucoDevice.connect(server.address, port=server.port)
+                async with device:
+                    self.assertEqual(device.api_version, api_version)
+                    self.assertEqual(await device.get_node_list(), [1, 2, 3])
+
+    async def test_connect_remembers_version(self):
+        async with FakeDucoServer(api_version=2.2, node_count=3) as server:
+            await (await DucoDevice.connect(server.address, port=server.port)).close()
+            probes = server.request_count
+            device = await DucoDevice.connect(server.address, port=server.port)
+            await device.close()
+            self.assertEqual(server.request_count, probes)
+            self.assertEqual(device.reported_api_version, "2.2")
+
+    async def test_connect_rejects_other_web_servers(self):
+        async def page(request):
+            return web.Response(text="<html>Not a Duco</html>", content_type="text/html")
+
+        app = web.Application()
+        app.router.add_get('/boxinfoget', page)
+        async with TestServer(app, host="127.0.0.1") as server:
+            with self.assertRaises(ConnectionError):
+                await DucoDevice.connect("127.0.0.1", port=server.port, probe_timeout=1)
+
+    async def test_connect_unreachable_device(self):
+        async with FakeDucoServer() as server:
+            port = server.port
+        with self.assertRaises(ConnectionError):
+            await DucoDevice.connect("127.0.0.1", port=port, probe_timeout=1)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
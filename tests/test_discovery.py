@@ -1,38 +1,86 @@
+import asyncio
+import time
 import unittest
-from unittest.mock import patch, Mock
-from zeroconf import Zeroconf, ServiceInfo
-from duco import discover_duco_devices  # Adjust import paths as necessary
+from unittest.mock import patch, Mock, AsyncMock
+from zeroconf import Zeroconf, ServiceInfo, ServiceStateChange
+from duco import (
+    DEVICE_ADDED,
+    DEVICE_REMOVED,
+    DEVICE_UPDATED,
+    async_discover_duco_devices,
+    async_stream_duco_devices,
+    discover_duco_devices,
+)  # Adjust import paths as necessary
+
+
+class FakeAsyncServiceInfo:
+    address = bytes([192, 168, 1, 16])
+
+    def __init__(self, service_type, name):
+        self.name = name
+        self.server = "duco001.local."
+        self.addresses = [self.address]
+        self.port = 80
+
+    async def async_request(self, zc, timeout):
+        # Yield like a real network request, so resolves can overlap
+        await asyncio.sleep(0)
+        return True
+
+
+class FakeAsyncServiceBrowser:
+    names = []
+
+    instance = None
+
+    def __init__(self, zeroconf, service_type, handlers):
+        FakeAsyncServiceBrowser.instance = self
+        self.zeroconf = zeroconf
+        self.service_type = service_type
+        self.handlers = handlers
+        # Announce every configured service straight away
+        for name in self.names:
+            self.emit(name, ServiceStateChange.Added)
+
+    def emit(self, name, state_change):
+        for handler in self.handlers:
+            handler(zeroconf=self.zeroconf, service_type=self.service_type, name=name, state_change=state_change)
+
+    async def async_cancel(self):
+        pass
 
 class TestDucoDiscovery(unittest.TestCase):
 
-    @patch('zeroconf.Zeroconf')
-    @patch('zeroconf.ServiceBrowser')
-    def test_discover_duco_devices(self, mock_service_browser, mock_zeroconf):
+    @patch('duco.discovery.get_api_version', return_value='2.2')
+    @patch('duco.discovery.ServiceBrowser')
+    def test_discover_duco_devices(self, mock_service_browser, mock_get_api_version):
         # Mock Zeroconf instance
         mock_zeroconf_instance = Mock()
-        mock_zeroconf.return_value = mock_zeroconf_instance
 
         # Create a mock ServiceInfo object
         mock_service_info = Mock(spec=ServiceInfo)
         mock_service_info.name = "DUCO [01025334A506]._http._tcp.local."
         mock_service_info.server = "duco001.local."
-        mock_service_info.addresses = [[192, 168, 1, 16]]
+        mock_service_info.addresses = [bytes([192, 168, 1, 16])]
         mock_service_info.port = 80
+        mock_zeroconf_instance.get_service_info.return_value = mock_service_info
 
         # Mock ServiceBrowser and its behavior
-        def add_listener(listener):
+        def add_listener(zeroconf, service_type, listener):
             # Directly call the listener's method to simulate service discovery
-            listener.add_service(mock_zeroconf_instance, "_http._tcp.local.", mock_service_info.name)
-        
-        mock_service_browser.side_effect = lambda *args, **kwargs: add_service(args[2])
+            listener.add_service(zeroconf, service_type, mock_service_info.name)
+
+        mock_service_browser.side_effect = add_listener
 
         # Test discover_duco_devices function
-        devices = discover_duco_devices(timeout=5, debug=True)
+        devices = discover_duco_devices(timeout=0, debug=True, zeroconf_instance=mock_zeroconf_instance)
         self.assertEqual(len(devices), 1)
         self.assertEqual(devices[0]['name'], mock_service_info.name)
-        self.assertEqual(devices[0]['address'], '192.168.11.16')
+        self.assertEqual(devices[0]['address'], '192.168.1.16')
         self.assertEqual(devices[0]['port'], mock_service_info.port)
         self.assertEqual(devices[0]['server'], mock_service_info.server)
+        self.assertEqual(devices[0]['api_version'], '2.2')
+        mock_get_api_version.assert_called_once_with('192.168.1.16', True)
 
     @patch('zeroconf.ServiceBrowser')
     @patch('zeroconf.Zeroconf')
@@ -44,5 +92,75 @@ class TestDucoDiscovery(unittest.TestCase):
         devices = discover_duco_devices(timeout=1, debug=True)
         self.assertEqual(len(devices), 0)
 
+class TestAsyncDucoDiscovery(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.aiozc = Mock()
+        patches = [
+            patch('duco.discovery.AsyncServiceBrowser', FakeAsyncServiceBrowser),
+            patch('duco.discovery.AsyncServiceInfo', FakeAsyncServiceInfo),
+            patch('duco.discovery.async_get_api_version', AsyncMock(return_value='2.2')),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        FakeAsyncServiceInfo.address = bytes([192, 168, 1, 16])
+
+    async def test_returns_early_when_expected_count_found(self):
+        FakeAsyncServiceBrowser.names = ["DUCO [01025334A506]._http._tcp.local.", "printer._http._tcp.local."]
+        started = time.monotonic()
+        devices = await async_discover_duco_devices(timeout=5, expected_count=1, aiozc=self.aiozc, session=Mock())
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(len(devices), 1)
+        self.assertEqual(devices[0]['address'], '192.168.1.16')
+        self.assertEqual(devices[0]['api_version'], '2.2')
+
+    async def test_quick_update_does_not_duplicate_a_device(self):
+        class UpdatingServiceBrowser(FakeAsyncServiceBrowser):
+            def __init__(self, zeroconf, service_type, handlers):
+                self.zeroconf = zeroconf
+                self.service_type = service_type
+                self.handlers = handlers
+                # The first device is updated before its first resolve finished
+                first, second = self.names
+                self.emit(first, ServiceStateChange.Added)
+                self.emit(first, ServiceStateChange.Updated)
+                self.emit(second, ServiceStateChange.Added)
+
+        async def slow_probe(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return '2.2'
+
+        FakeAsyncServiceBrowser.names = ["DUCO [A]._http._tcp.local.", "DUCO [B]._http._tcp.local."]
+        with patch('duco.discovery.AsyncServiceBrowser', UpdatingServiceBrowser), \
+                patch('duco.discovery.async_get_api_version', slow_probe):
+            devices = await async_discover_duco_devices(timeout=1, expected_count=2, aiozc=self.aiozc,
+                                                        session=Mock())
+        self.assertEqual(sorted(device['name'] for device in devices), FakeAsyncServiceBrowser.names)
+
+    async def test_no_duco_devices_found(self):
+        FakeAsyncServiceBrowser.names = ["printer._http._tcp.local."]
+        devices = await async_discover_duco_devices(timeout=0.1, aiozc=self.aiozc, session=Mock())
+        self.assertEqual(devices, [])
+
+    async def test_stream_reports_updates_and_removals(self):
+        name = "DUCO [01025334A506]._http._tcp.local."
+        FakeAsyncServiceBrowser.names = [name]
+        stream = async_stream_duco_devices(aiozc=self.aiozc, session=Mock())
+        try:
+            event = await stream.__anext__()
+            self.assertEqual(event.event, DEVICE_ADDED)
+
+            FakeAsyncServiceInfo.address = bytes([192, 168, 1, 17])
+            FakeAsyncServiceBrowser.instance.emit(name, ServiceStateChange.Updated)
+            event = await stream.__anext__()
+            self.assertEqual(event.event, DEVICE_UPDATED)
+            self.assertEqual(event.device['address'], '192.168.1.17')
+
+            FakeAsyncServiceBrowser.instance.emit(name, ServiceStateChange.Removed)
+            event = await stream.__anext__()
+            self.assertEqual(event.event, DEVICE_REMOVED)
+        finally:
+            await stream.aclose()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, Mock, AsyncMock
+from duco import DEVICE_ADDED, DiscoveryCache, DiscoveryEvent, async_load_duco_devices
+
+CACHED_DEVICES = [
+    {'name': 'DUCO [A]._http._tcp.local.', 'address': '192.168.1.16', 'port': 80, 'server': 'duco-a.local.',
+     'api_version': '2.2', 'board_serial': 'SERIAL-A'},
+    {'name': 'DUCO [B]._http._tcp.local.', 'address': '192.168.1.17', 'port': 80, 'server': 'duco-b.local.',
+     'api_version': '1.0', 'board_serial': 'SERIAL-B'},
+]
+
+
+class TestDiscoveryCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "pyduco", "devices.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        cache = DiscoveryCache(self.path)
+        cache.save(CACHED_DEVICES)
+        self.assertEqual(cache.load(), CACHED_DEVICES)
+
+    def test_corrupt_file_loads_empty(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as cache_file:
+            cache_file.write("{not json")
+        self.assertEqual(DiscoveryCache(self.path).load(), [])
+
+
+class TestAsyncLoadDucoDevices(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "devices.json")
+        DiscoveryCache(self.path).save(CACHED_DEVICES)
+
+    async def asyncTearDown(self):
+        self.tmpdir.cleanup()
+
+    async def test_valid_cache_skips_discovery(self):
+        with patch('duco.discovery_cache.async_get_board_serial', AsyncMock(side_effect=['SERIAL-A', 'SERIAL-B'])), \
+                patch('duco.discovery_cache.async_stream_duco_devices') as stream:
+            devices, task = await async_load_duco_devices(path=self.path, session=Mock())
+        self.assertEqual(devices, CACHED_DEVICES)
+        self.assertIsNone(task)
+        stream.assert_not_called()
+
+    async def test_stale_entry_is_rediscovered_in_background(self):
+        moved = dict(CACHED_DEVICES[1], address='192.168.1.30')
+
+        async def fake_stream(**kwargs):
+            yield DiscoveryEvent(DEVICE_ADDED, dict(moved))
+
+        serials = AsyncMock(side_effect=['SERIAL-A', None, 'SERIAL-B'])
+        with patch('duco.discovery_cache.async_get_board_serial', serials), \
+                patch('duco.discovery_cache.async_stream_duco_devices', fake_stream):
+            devices, task = await async_load_duco_devices(path=self.path, session=Mock())
+            self.assertEqual(devices, CACHED_DEVICES[:1])
+            rediscovered = await task
+        self.assertEqual(rediscovered, [moved])
+        self.assertEqual(DiscoveryCache(self.path).load(), [CACHED_DEVICES[0], moved])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from duco import DucoFleet, async_fleet_columns, snapshot_to_columns
+from duco.export import sensor_fields
+from duco.simulator import FakeDucoServer
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+SNAPSHOTS = {
+    "box-a": {
+        1: {"node": 1, "devtype": "BOX", "state": "AUTO", "serialnb": "RS1", "trgt": 20},
+        2: {"node": 2, "devtype": "UCCO2", "co2": 600, "temp": 21.5},
+    },
+    "box-b": {
+        2: {"node": 2, "devtype": "UCRH", "rh": 45, "temp": "-"},
+        3: None,
+    },
+}
+
+
+class TestSnapshotToColumns(unittest.TestCase):
+    def test_sensor_fields_are_numeric_readings(self):
+        self.assertEqual(sensor_fields(SNAPSHOTS), ["co2", "rh", "temp", "ventilation_flow_lvl_tgt"])
+
+    def test_list_backend_aligns_rows(self):
+        columns = snapshot_to_columns(SNAPSHOTS, backend="list")
+        self.assertEqual(columns["host"], ["box-a", "box-a", "box-b"])
+        self.assertEqual(columns["node"], [1, 2, 2])
+        self.assertEqual(columns["co2"], [None, 600.0, None])
+        self.assertEqual(columns["temp"], [None, 21.5, None])
+
+    def test_selected_fields(self):
+        columns = snapshot_to_columns(SNAPSHOTS, fields=["rh", "missing"], backend="list")
+        self.assertEqual(list(columns), ["host", "node", "rh", "missing"])
+        self.assertEqual(columns["missing"], [None, None, None])
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            snapshot_to_columns(SNAPSHOTS, backend="csv")
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_numpy_backend_masks_missing_values(self):
+        columns = snapshot_to_columns(SNAPSHOTS, backend="numpy")
+        self.assertEqual(columns["rh"].mask.tolist(), [True, True, False])
+        self.assertEqual(columns["temp"].mean(), 21.5)
+        self.assertEqual(columns["node"].tolist(), [1, 2, 2])
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_arrow_backend_uses_nulls(self):
+        table = snapshot_to_columns(SNAPSHOTS, backend="arrow")
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(table.column("co2").to_pylist(), [None, 600.0, None])
+
+
+class TestFleetColumns(unittest.IsolatedAsyncioTestCase):
+    async def test_fleet_export(self):
+        async with FakeDucoServer(api_version=2.2, node_count=5) as first, \
+                FakeDucoServer(api_version=1.0, node_count=3) as second:
+            async with DucoFleet() as fleet:
+                fleet.add_device(first.address, port=first.port, api_version=2.2)
+                fleet.add_device(second.address, port=second.port, api_version=1.0)
+                columns, errors = await async_fleet_columns(fleet, backend="list", timeout=2)
+        self.assertEqual(len(columns["node"]), 8)
+        self.assertEqual(sorted(value for value in columns["co2"] if value is not None), [600.0, 600.0])
+        # Both API versions report the flow target under one name, so the column has no gaps
+        self.assertEqual(columns["ventilation_flow_lvl_tgt"], [20.0, 35.0, 35.0, 35.0, 35.0, 20.0, 35.0, 35.0])
+        self.assertNotIn("trgt", columns)
+        self.assertNotIn("ventilation_time_state_remain", columns)
+        self.assertNotIn("identify", columns)
+        self.assertEqual(errors, {})
+
+    async def test_unreachable_device_is_an_error(self):
+        async with FakeDucoServer(api_version=1.0, node_count=2) as server:
+            async with DucoFleet() as fleet:
+                fleet.add_device(server.address, port=server.port, api_version=1.0)
+                fleet.add_device("127.0.0.1", port=1, api_version=2.2, retries=0)
+                columns, errors = await async_fleet_columns(fleet, backend="list", timeout=2)
+        self.assertEqual(len(columns["node"]), 2)
+        self.assertEqual(list(errors), ["127.0.0.1:1"])
+        self.assertIsInstance(errors["127.0.0.1:1"], ConnectionError)
+
+if __name__ == '__main__':
+    unittest.main()
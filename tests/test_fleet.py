@@ -0,0 +1,36 @@
+import asyncio
+import unittest
+from unittest.mock import patch, AsyncMock
+from duco import DucoFleet
+
+
+class TestDucoFleet(unittest.IsolatedAsyncioTestCase):
+    async def test_devices_share_one_connector(self):
+        async with DucoFleet(limit=8, limit_per_host=2) as fleet:
+            first = fleet.add_device("192.168.1.10")
+            second = fleet.add_device("192.168.1.11", api_version="2.2")
+            self.assertIs((await first.get_session()).connector, (await second.get_session()).connector)
+            self.assertEqual(second.api_version, 2.2)
+            self.assertEqual(fleet.connector.limit_per_host, 2)
+
+    async def test_snapshot_all_yields_as_completed(self):
+        async def slow(max_concurrency):
+            await asyncio.sleep(5)
+
+        async with DucoFleet(timeout=0.2) as fleet:
+            dead = fleet.add_device("192.168.1.10")
+            broken = fleet.add_device("192.168.1.11")
+            healthy = fleet.add_device("192.168.1.12")
+            with patch.object(dead, 'get_all_node_info', slow), \
+                    patch.object(broken, 'get_all_node_info', AsyncMock(side_effect=OSError("unreachable"))), \
+                    patch.object(healthy, 'get_all_node_info', AsyncMock(return_value=({1: {"node": 1}}, {}))):
+                results = [result async for result in fleet.snapshot_all()]
+
+        self.assertEqual([result.device for result in results][-1], dead)
+        by_device = {result.device: result for result in results}
+        self.assertEqual(by_device[healthy].result, ({1: {"node": 1}}, {}))
+        self.assertIsInstance(by_device[broken].error, OSError)
+        self.assertIsInstance(by_device[dead].error, asyncio.TimeoutError)
+
+if __name__ == '__main__':
+    unittest.main()
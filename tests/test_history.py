@@ -0,0 +1,78 @@
+import unittest
+from duco import DucoDevice, HistoryStore
+from duco.simulator import FakeDucoServer
+
+
+class HistoryStoreTests:
+    use_numpy = None
+
+    def setUp(self):
+        self.store = HistoryStore(capacity=4, max_series=3, use_numpy=self.use_numpy)
+
+    def test_only_numeric_readings_are_kept(self):
+        self.store.record(2, {"node": 2, "devtype": "UCCO2", "state": "AUTO", "co2": 600, "temp": 21.5}, timestamp=0)
+        self.assertEqual(sorted(self.store.keys()), [(2, "co2"), (2, "temp")])
+
+    def test_ring_buffer_keeps_latest_samples(self):
+        for second in range(6):
+            self.store.record(2, {"co2": 600 + second}, timestamp=second)
+        times, values = self.store.series(2, "co2")
+        self.assertEqual(list(times), [2, 3, 4, 5])
+        self.assertEqual(list(values), [602, 603, 604, 605])
+        self.assertEqual(list(self.store.series(2, "co2", since=4)[1]), [604, 605])
+
+    def test_series_limit(self):
+        self.store.record(2, {"co2": 1, "rh": 2, "temp": 3, "trgt": 4}, timestamp=0)
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(self.store.dropped, 1)
+        self.assertEqual(self.store.nbytes, 3 * 4 * 16)
+
+    def test_rollup(self):
+        for second, value in enumerate([600, 700, 650, 800]):
+            self.store.record(2, {"co2": value}, timestamp=second)
+        rollup = self.store.rollup(2, "co2", window=2)
+        self.assertEqual(rollup, [
+            {"start": 0, "min": 600, "max": 700, "mean": 650, "count": 2},
+            {"start": 2, "min": 650, "max": 800, "mean": 725, "count": 2},
+        ])
+
+    def test_export(self):
+        self.store.record(2, {"co2": 600}, timestamp=1)
+        self.store.record(3, {"rh": 45}, timestamp=1)
+        exported = self.store.export()
+        self.assertEqual(list(exported[(3, "rh")][1]), [45])
+
+
+class TestHistoryStoreArray(HistoryStoreTests, unittest.TestCase):
+    use_numpy = False
+
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestHistoryStoreNumpy(HistoryStoreTests, unittest.TestCase):
+    use_numpy = True
+
+
+class TestDeviceHistory(unittest.IsolatedAsyncioTestCase):
+    async def test_fetched_node_info_is_recorded(self):
+        history = HistoryStore()
+        async with FakeDucoServer(api_version=2.2, node_count=3) as server:
+            async with DucoDevice(server.address, port=server.port, api_version=2.2, history=history) as device:
+                await device.get_all_node_info()
+        self.assertEqual(list(history.series(2, "co2")[1]), [600])
+
+    async def test_only_readings_of_api_v2_nodes_are_recorded(self):
+        history = HistoryStore()
+        async with FakeDucoServer(api_version=2.2, node_count=2) as server:
+            async with DucoDevice(server.address, port=server.port, api_version=2.2, history=history) as device:
+                await device.get_all_node_info()
+        self.assertEqual(sorted(field for node, field in history.keys() if node == 2),
+                         ["co2", "temp", "ventilation_flow_lvl_tgt"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import subprocess
+import sys
+import unittest
+import duco
+
+
+def _loaded_modules(statement):
+    code = f"import sys\n{statement}\nprint(' '.join(sorted(sys.modules)))"
+    output = subprocess.check_output([sys.executable, "-c", code], text=True)
+    return set(output.split())
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_import_does_not_load_submodules(self):
+        modules = _loaded_modules("import duco")
+        self.assertNotIn("duco.device", modules)
+        self.assertNotIn("aiohttp", modules)
+
+    def test_device_does_not_load_discovery_dependencies(self):
+        modules = _loaded_modules("import duco; duco.DucoDevice")
+        self.assertIn("duco.device", modules)
+        self.assertNotIn("duco.discovery", modules)
+        self.assertNotIn("zeroconf", modules)
+        self.assertNotIn("requests", modules)
+
+    def test_every_public_name_resolves(self):
+        for name in duco.__all__:
+            self.assertIsNotNone(getattr(duco, name), name)
+        self.assertTrue(set(duco.__all__) <= set(dir(duco)))
+
+    def test_unknown_attribute_raises(self):
+        with self.assertRaises(AttributeError):
+            duco.NotAThing
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import unittest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from duco import DucoDevice
+from duco.metrics import MetricsCollector, endpoint_name, export_prometheus
+
+
+class TestEndpointName(unittest.TestCase):
+    def test_ids_and_query_arguments_are_dropped(self):
+        self.assertEqual(endpoint_name("info/nodes/12"), "info/nodes/{id}")
+        self.assertEqual(endpoint_name("nodeinfoget?node=5"), "nodeinfoget")
+        self.assertEqual(endpoint_name("info"), "info")
+
+
+class TestMetricsCollector(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        async def nodeinfoget(request):
+            return web.Response(text=json.dumps({"node": 1}), content_type="application/json")
+
+        async def broken(request):
+            raise web.HTTPInternalServerError()
+
+        async def slow(request):
+            await asyncio.sleep(1)
+            return web.Response(text="{}", content_type="application/json")
+
+        app = web.Application()
+        app.router.add_get('/nodeinfoget', nodeinfoget)
+        app.router.add_get('/broken', broken)
+        app.router.add_get('/slow', slow)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_requests_cache_and_errors_are_counted(self):
+        metrics = MetricsCollector()
+        device = DucoDevice(address=self.server.host, port=self.server.port, instrumentation=metrics)
+        async with device:
+            await device.get_node_info(1)
+            await device.get_node_info(1)
+            with self.assertLogs('duco.device', level='WARNING') as logs:
+                self.assertIsNone(await device.fetch_json("missing"))
+        host = f"{self.server.host}:{self.server.port}"
+        self.assertEqual(metrics.requests[(host, "nodeinfoget")], 1)
+        self.assertEqual(metrics.response_bytes[(host, "nodeinfoget")], len(json.dumps({"node": 1})))
+        self.assertEqual(metrics.cache_hits[(host, "node_info")], 1)
+        self.assertEqual(metrics.cache_misses[(host, "node_info")], 1)
+        self.assertEqual(metrics.errors[(host, "missing")], 1)
+        self.assertIn("status=404", logs.output[0])
+
+        text = export_prometheus(metrics)
+        self.assertIn(f'pyduco_requests_total{{host="{host}",endpoint="nodeinfoget"}} 1', text)
+        self.assertIn(f'pyduco_request_duration_seconds_bucket{{host="{host}",endpoint="nodeinfoget",le="+Inf"}} 1', text)
+        self.assertIn("# TYPE pyduco_request_duration_seconds histogram", text)
+
+    async def test_failed_attempts_are_timed(self):
+        metrics = MetricsCollector()
+        device = DucoDevice(address=self.server.host, port=self.server.port, instrumentation=metrics, retries=1,
+                            backoff_base=0, read_timeout=0.1, adaptive_timeout=False)
+        async with device:
+            with self.assertLogs('duco.device', level='WARNING'):
+                self.assertIsNone(await device.fetch_json("broken"))
+                self.assertIsNone(await device.fetch_json("slow"))
+        host = f"{self.server.host}:{self.server.port}"
+        self.assertEqual(metrics.requests[(host, "broken")], 2)
+        self.assertEqual(metrics.requests[(host, "slow")], 2)
+        self.assertGreaterEqual(metrics.duration_sum[(host, "slow")], 0.2)
+        self.assertEqual(metrics.duration_buckets[(host, "slow")][-1], 2)
+        self.assertEqual(metrics.errors[(host, "slow")], 1)
+
+    async def test_requests_blocked_by_the_circuit_breaker_are_not_counted(self):
+        device = DucoDevice(address=self.server.host, port=self.server.port, retries=0, failure_threshold=1)
+        async with device:
+            with self.assertLogs('duco.device', level='WARNING'):
+                await device.fetch_json("broken")
+            for _ in range(3):
+                self.assertIsNone(await device.fetch_json("nodeinfoget?node=1"))
+        self.assertEqual(device.request_stats, {"requests": 1, "coalesced": 0})
+
+if __name__ == '__main__':
+    unittest.main()
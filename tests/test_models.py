@@ -0,0 +1,73 @@
+import unittest
+from duco.models import NodeInfo, parse_node_info_v1, parse_node_info_v2
+
+V2_PAYLOAD = {
+    "Node": 2,
+    "General": {
+        "Type": {"Val": "UCCO2"},
+        "SubType": {"Val": 0},
+        "NetworkType": {"Val": "RF"},
+        "Parent": {"Val": 1},
+        "Asso": {"Val": 1},
+        "Name": {"Val": "Living room"},
+        "Identify": {"Val": 0},
+    },
+    "Ventilation": {
+        "State": {"Val": "AUTO"},
+        "TimeStateRemain": {"Val": 0},
+        "TimeStateEnd": {"Val": 0},
+        "Mode": {"Val": "-"},
+        "FlowLvlTgt": {"Val": 35},
+    },
+    "Sensor": {"Co2": {"Val": 612}, "IaqCo2": {"Val": 80}},
+}
+
+V1_PAYLOAD = {
+    "node": 2, "devtype": "UCCO2", "subtype": 0, "netw": "RF", "addr": 1, "sub": 1, "prnt": 1, "asso": 1,
+    "location": "Living room", "state": "AUTO", "cntdwn": 0, "endtime": 0, "mode": "-", "trgt": 35, "co2": 612,
+    "error": "-", "show": 0, "link": 0, "serialnb": "RS1234", "swversion": "16036.13.4.0",
+}
+
+
+class TestParseNodeInfoV2(unittest.TestCase):
+    def test_flat_fields(self):
+        node_info = parse_node_info_v2(V2_PAYLOAD)
+        self.assertEqual(list(node_info)[:8], ["node", "devtype", "subtype", "netw", "prnt", "asso", "location", "identify"])
+        self.assertEqual(node_info["ventilation_flow_lvl_tgt"], 35)
+        self.assertEqual(node_info["co2"], 612)
+        self.assertEqual(node_info["iaqco2"], 80)
+
+    def test_missing_sections(self):
+        node_info = parse_node_info_v2({"Node": 1})
+        self.assertEqual(node_info["node"], 1)
+        self.assertIsNone(node_info["devtype"])
+        self.assertIsNone(node_info["ventilation_state"])
+
+
+class TestNodeInfo(unittest.TestCase):
+    def test_v1_and_v2_share_identity_fields(self):
+        v1 = NodeInfo.from_v1(V1_PAYLOAD)
+        v2 = NodeInfo.from_v2(V2_PAYLOAD)
+        for field in ("node", "devtype", "netw", "prnt", "location", "ventilation_state", "ventilation_mode",
+                      "ventilation_flow_lvl_tgt"):
+            self.assertEqual(getattr(v1, field), getattr(v2, field))
+
+    def test_v1_fields_are_renamed(self):
+        node_info = parse_node_info_v1(V1_PAYLOAD)
+        self.assertEqual(node_info["ventilation_flow_lvl_tgt"], 35)
+        self.assertEqual(node_info["ventilation_time_state_remain"], 0)
+        self.assertNotIn("state", node_info)
+        self.assertEqual(node_info["serialnb"], "RS1234")
+
+    def test_sensors_skip_metadata_and_empty_values(self):
+        self.assertEqual(NodeInfo.from_v1(V1_PAYLOAD).sensors(), ["ventilation_state", "ventilation_flow_lvl_tgt", "co2"])
+        self.assertEqual(NodeInfo.from_v2(V2_PAYLOAD).sensors(), ["ventilation_state", "ventilation_flow_lvl_tgt", "co2", "iaqco2"])
+
+    def test_round_trip_and_slots(self):
+        record = NodeInfo.from_v1(V1_PAYLOAD)
+        self.assertEqual(record.as_dict(), parse_node_info_v1(V1_PAYLOAD))
+        self.assertEqual(record.get("serialnb"), "RS1234")
+        self.assertFalse(hasattr(record, "__dict__"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import unittest
+import aiohttp
+from duco import DucoDevice
+from duco.proxy import DucoProxy
+from duco.simulator import FakeDucoServer
+
+
+class TestDucoProxy(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = FakeDucoServer(api_version=2.2, node_count=4)
+        await self.server.start()
+        self.upstream = DucoDevice(self.server.address, port=self.server.port, api_version=2.2)
+        self.proxy = DucoProxy(self.upstream, port=0, poll_interval=60)
+        await self.proxy.start()
+        self.client = DucoDevice("127.0.0.1", port=self.proxy.port, api_version=2.2, cache_ttl={"node_info": 0})
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.proxy.close()
+        await self.upstream.close()
+        await self.server.close()
+
+    async def test_reads_are_served_from_cache(self):
+        requests = self.server.request_count
+        for _ in range(3):
+            nodes, errors = await self.client.get_all_node_info()
+            self.assertEqual(sorted(nodes), [1, 2, 3, 4])
+        self.assertEqual((await self.client.get_node_info(2))["co2"], 600)
+        self.assertEqual(await self.client.get_node_list(), [1, 2, 3, 4])
+        self.assertEqual(self.server.request_count, requests)
+
+    async def test_writes_are_forwarded_and_pushed(self):
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(f"http://127.0.0.1:{self.proxy.port}/ws") as websocket:
+                async with session.get(f"http://127.0.0.1:{self.proxy.port}/events") as events:
+                    await asyncio.sleep(0.05)
+                    response = await self.client.set_node_operational_state(2, "MAN2")
+                    self.assertEqual(response, {"action_state": "SUCCESS"})
+                    self.assertEqual(self.server.nodes[2]["state"], "MAN2")
+                    self.assertEqual((await self.client.get_node_info(2))["ventilation_state"], "MAN2")
+
+                    message = json.loads((await asyncio.wait_for(websocket.receive(), 1)).data)
+                    self.assertEqual((message["node"], message["field"], message["new"]), (2, "ventilation_state", "MAN2"))
+
+                    lines = [await asyncio.wait_for(events.content.readline(), 1) for _ in range(2)]
+                    self.assertEqual(lines[0], b"event: delta\n")
+                    self.assertEqual(json.loads(lines[1][len(b"data: "):])["new"], "MAN2")
+
+    async def test_api_v1_writes_go_through_the_write_queue(self):
+        legacy = DucoDevice("127.0.0.1", port=self.proxy.port, api_version=1.0, retries=3)
+        async with legacy:
+            self.assertEqual(await legacy.set_node_operational_state(2, "MAN2"), {"action_state": "SUCCESS"})
+        self.assertEqual(self.server.path_counts["/nodesetoperstate"], 1)
+        self.assertEqual((await self.client.get_node_info(2))["ventilation_state"], "MAN2")
+
+    async def test_missing_bulk_endpoint_is_polled_once(self):
+        async with FakeDucoServer(api_version=2.2, node_count=3, bulk_endpoint=False) as server:
+            async with DucoDevice(server.address, port=server.port, api_version=2.2) as upstream:
+                proxy = DucoProxy(upstream, port=0, poll_interval=60)
+                await proxy.start()
+                try:
+                    await proxy.poll_once()
+                    await proxy.poll_once()
+                finally:
+                    await proxy.close()
+        self.assertEqual(server.path_counts["/info/nodes"], 1)
+        self.assertEqual(server.path_counts["/info/nodes/2"], 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import unittest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from duco import DucoDevice
+from duco.resilience import CircuitBreaker, RttTracker, backoff_delay
+from duco.simulator import FakeDucoServer
+
+
+class TestRttTracker(unittest.TestCase):
+    def test_default_until_enough_samples(self):
+        tracker = RttTracker(min_samples=3)
+        tracker.record(0.05)
+        self.assertEqual(tracker.timeout(5), 5)
+
+    def test_timeout_follows_percentile(self):
+        tracker = RttTracker(min_samples=3)
+        for rtt in (0.1, 0.2, 0.3, 0.4):
+            tracker.record(rtt)
+        self.assertEqual(tracker.percentile(100), 0.4)
+        self.assertAlmostEqual(tracker.timeout(5, factor=4.0, minimum=0.5), 1.6)
+        self.assertEqual(tracker.timeout(1), 1)
+
+
+class TestBackoff(unittest.TestCase):
+    def test_delay_is_capped(self):
+        self.assertEqual(backoff_delay(10, base=0.2, cap=2.0, rng=lambda: 1.0), 2.0)
+        self.assertAlmostEqual(backoff_delay(2, base=0.2, cap=2.0, rng=lambda: 0.5), 0.4)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+        self.assertFalse(breaker.record_failure())
+        self.assertTrue(breaker.record_failure())
+        self.assertFalse(breaker.allow_request())
+        breaker.record_success()
+        self.assertTrue(breaker.allow_request())
+
+
+class TestDeviceResilience(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.hits = 0
+        self.healthy = False
+
+        async def nodelist(request):
+            self.hits += 1
+            if not self.healthy:
+                await asyncio.sleep(1)
+            return web.Response(text=json.dumps({"nodelist": [1]}), content_type="application/json")
+
+        app = web.Application()
+        app.router.add_get('/nodelist', nodelist)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_retries_then_fails_fast_until_probe_succeeds(self):
+        device = DucoDevice(address=self.server.host, port=self.server.port, read_timeout=0.1, retries=1,
+                            backoff_base=0.01, failure_threshold=1, reset_timeout=0.1, cache_ttl={"node_list": 0})
+        async with device:
+            self.assertIsNone(await device.fetch_json("nodelist"))
+            self.assertEqual(self.hits, 2)
+            self.assertTrue(device.circuit_breaker.is_open)
+
+            # While the circuit is open requests do not reach the device
+            self.assertIsNone(await device.fetch_json("nodelist"))
+            self.assertEqual(self.hits, 2)
+
+            self.healthy = True
+            for _ in range(50):
+                if not device.circuit_breaker.is_open:
+                    break
+                await asyncio.sleep(0.05)
+            self.assertEqual(await device.get_node_list(), [1])
+
+
+class TestAdaptiveTimeoutPerEndpoint(unittest.IsolatedAsyncioTestCase):
+    async def test_fast_reads_do_not_shorten_a_slow_endpoint(self):
+        async with FakeDucoServer(api_version=2.2, node_count=5, path_latency={"/info/nodes": 0.7}) as server:
+            async with DucoDevice(server.address, port=server.port, api_version=2.2,
+                                  cache_ttl={"node_info": 0}) as device:
+                for _ in range(3):
+                    for node in range(1, 6):
+                        await device.get_node_info(node)
+                self.assertEqual(device.rtt["info/nodes/{id}"].timeout(5), 0.5)
+
+                nodes, errors = await device.get_all_node_info()
+        self.assertEqual(sorted(nodes), [1, 2, 3, 4, 5])
+        self.assertEqual(errors, {})
+        self.assertEqual(server.path_counts["/info/nodes"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
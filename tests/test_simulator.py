@@ -0,0 +1,73 @@
+import unittest
+from duco import DucoDevice
+from duco.simulator import FakeDucoServer
+
+
+class TestDeviceAgainstFakeServer(unittest.IsolatedAsyncioTestCase):
+    async def test_api_v1_sweep(self):
+        async with FakeDucoServer(api_version=1.0, node_count=6) as server:
+            async with DucoDevice(server.address, port=server.port, api_version=1.0) as device:
+                self.assertEqual(await device.get_node_list(), [1, 2, 3, 4, 5, 6])
+                nodes, errors = await device.get_all_node_info()
+                self.assertEqual(errors, {})
+                self.assertEqual(nodes[2]["co2"], 600)
+                self.assertEqual(await device.get_wired_nodes(), [4])
+                self.assertEqual((await device.get_cap_board_info())["serial"], "FAKE00000001")
+        self.assertEqual(server.path_counts["/nodeinfoget"], 6)
+
+    async def test_api_v1_node_info_keeps_device_field_names(self):
+        async with FakeDucoServer(api_version=1.0, node_count=3) as server:
+            async with DucoDevice(server.address, port=server.port, api_version=1.0) as device:
+                self.assertEqual(await device.get_node_attribute_value(2, "state"), "AUTO")
+                self.assertEqual(await device.get_node_key_value(2, "trgt"), 35)
+                self.assertEqual(await device.get_valid_node_sensors(2), ["state", "trgt", "co2", "temp"])
+                record = await device.get_node_record(2)
+        self.assertEqual((record.ventilation_state, record.ventilation_flow_lvl_tgt), ("AUTO", 35))
+
+    async def test_api_v2_bulk_snapshot(self):
+        async with FakeDucoServer(api_version=2.2, node_count=6) as server:
+            async with DucoDevice(server.address, port=server.port, api_version=2.2) as device:
+                nodes, errors = await device.get_all_node_info()
+                self.assertEqual(sorted(nodes), [1, 2, 3, 4, 5, 6])
+                self.assertEqual(nodes[3]["rh"], 45)
+                self.assertEqual(await device.get_valid_node_sensors(2), ["ventilation_state", "ventilation_flow_lvl_tgt", "co2", "temp"])
+        self.assertEqual(server.path_counts["/info/nodes"], 1)
+        self.assertNotIn("/info/nodes/2", server.path_counts)
+
+    async def test_api_v2_without_bulk_endpoint(self):
+        async with FakeDucoServer(api_version=2.2, node_count=4, bulk_endpoint=False) as server:
+            async with DucoDevice(server.address, port=server.port, api_version=2.2) as device:
+                with self.assertNoLogs("duco.device", level="WARNING"):
+                    for _ in range(3):
+                        device.invalidate_cache()
+                        nodes, errors = await device.get_all_node_info()
+                self.assertFalse(device.supports_endpoint("info/nodes"))
+        self.assertEqual(sorted(nodes), [1, 2, 3, 4])
+        self.assertEqual(server.path_counts["/info/nodes"], 1)
+        self.assertEqual(server.path_counts["/info/nodes/2"], 3)
+
+    async def test_writes_and_failures(self):
+        async with FakeDucoServer(api_version=1.0, node_count=3, failure_rate=1.0, seed=1) as server:
+            device = DucoDevice(server.address, port=server.port, retries=0, failure_threshold=100)
+            async with device:
+                self.assertIsNone(await device.fetch_json("nodelist"))
+                server.failure_rate = 0
+                results = await device.set_nodes_batch([(2, "MAN2"), (3, "location", "Hall")], verify=True)
+        self.assertTrue(all(result.verified for result in results))
+        self.assertEqual(server.nodes[3]["location"], "Hall")
+
+    async def test_retarget_moves_requests_to_the_new_address(self):
+        async with FakeDucoServer(api_version=1.0, node_count=2) as old, \
+                FakeDucoServer(api_version=1.0, node_count=3) as new:
+            async with DucoDevice(old.address, port=old.port) as device:
+                self.assertEqual(await device.get_node_list(), [1, 2])
+                with self.assertRaises(AttributeError):
+                    device.port = new.port
+                device.retarget(port=new.port)
+                self.assertEqual(device.port, new.port)
+                self.assertEqual(await device.get_node_list(), [1, 2, 3])
+        self.assertEqual(old.path_counts["/nodelist"], 1)
+        self.assertEqual(new.path_counts["/nodelist"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
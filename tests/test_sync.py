@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from duco import DucoDeviceSync
+from duco.simulator import FakeDucoServer
+from duco.sync import get_background_loop
+
+
+class TestDucoDeviceSync(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.loop = get_background_loop()
+        cls.server = FakeDucoServer(api_version=1.0, node_count=4)
+        asyncio.run_coroutine_threadsafe(cls.server.start(), cls.loop).result(5)
+
+    @classmethod
+    def tearDownClass(cls):
+        asyncio.run_coroutine_threadsafe(cls.server.close(), cls.loop).result(5)
+
+    def setUp(self):
+        self.device = DucoDeviceSync(self.server.address, port=self.server.port, timeout=5)
+
+    def tearDown(self):
+        self.device.close()
+
+    def test_blocking_calls_reuse_one_session(self):
+        self.assertEqual(self.device.get_node_list(), [1, 2, 3, 4])
+        session = self.device._session
+        self.assertEqual(self.device.get_node_info(2)["devtype"], "UCCO2")
+        self.assertIs(self.device._session, session)
+
+    def test_writes(self):
+        self.assertEqual(self.device.set_node_operational_state(2, "MAN2"), {"action_state": "SUCCESS"})
+        self.assertEqual(self.server.nodes[2]["state"], "MAN2")
+
+    def test_async_iterators_become_iterators(self):
+        nodes = {node for node, node_info, error in self.device.iter_all_node_info()}
+        self.assertEqual(nodes, {1, 2, 3, 4})
+
+    def test_calls_from_many_threads(self):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(self.device.get_node_info, [1, 2, 3, 4] * 5))
+        self.assertEqual([result["node"] for result in results], [1, 2, 3, 4] * 5)
+
+    def test_connect_detects_version(self):
+        with DucoDeviceSync.connect(self.server.address, port=self.server.port, timeout=5) as device:
+            self.assertEqual(device.api_version, 1.0)
+
+    def test_own_running_loop_is_rejected(self):
+        async def create():
+            return DucoDeviceSync(self.server.address, port=self.server.port, loop=asyncio.get_running_loop())
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(create())
+
+    def test_loop_runs_in_a_daemon_thread(self):
+        self.assertIs(get_background_loop(), self.loop)
+        self.assertTrue(self.loop.is_running())
+        self.assertTrue(all(thread.daemon for thread in threading.enumerate() if thread.name == "pyduco-loop"))
+
+
+if __name__ == '__main__':
+    unittest.main()